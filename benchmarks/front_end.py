@@ -0,0 +1,120 @@
+"""
+Front end scaling for large generated scripts.
+
+    python benchmarks/front_end.py [--mb n] [--steps n]
+
+Generates scripts of a few machine-written shapes (many small functions,
+long else-if chains, long operator chains, deeply nested blocks) at steps
+sizes doubling up to mb megabytes, times scanning, parsing and resolving
+each one and reports the seconds per megabyte. Exits with 1 when a shape
+fails to compile or the largest size costs more than LINEAR_SLACK times
+the per megabyte cost of the smallest one.
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lox.program import CompileError, front_end
+
+# allowed growth of the per megabyte cost from the smallest to largest size
+LINEAR_SLACK = 1.5
+
+
+def functions(size: int) -> str:
+    parts = []
+    i = 0
+    while size > 0:
+        part = (
+            f"fun f{i}(a, b) {{\n"
+            f"  var c = a * {i} + b;\n"
+            f"  if (c > {i}) return c - 1; else return c + 1;\n"
+            f"}}\n"
+            f"print f{i}({i}, 2);\n"
+        )
+        parts.append(part)
+        size -= len(part)
+        i += 1
+    return "".join(parts)
+
+
+def else_if(size: int) -> str:
+    parts = ["var x = 0;\n"]
+    i = 0
+    while size > 0:
+        part = f"if (x == {i}) print {i};\nelse "
+        parts.append(part)
+        size -= len(part)
+        i += 1
+    parts.append("print -1;\n")
+    return "".join(parts)
+
+
+def expressions(size: int) -> str:
+    parts = ["var x = 0"]
+    i = 0
+    while size > 0:
+        part = f" + {i} * 2" if i % 2 else f" - {i}"
+        parts.append(part)
+        size -= len(part)
+        i += 1
+    parts.append(";\nprint x;\n")
+    return "".join(parts)
+
+
+def nested(size: int) -> str:
+    # a few thousand levels per block, repeated to fill size
+    depth = 2000
+    block = "{ var x = 1;\n" * depth + "print x;\n" + "}\n" * depth
+    return block * max(1, size // len(block))
+
+
+SHAPES = {
+    "functions": functions,
+    "else-if": else_if,
+    "expressions": expressions,
+    "nested": nested,
+}
+
+
+def measure(code: str) -> float:
+    start = time.perf_counter()
+    front_end(code)
+    return time.perf_counter() - start
+
+
+def main(args: list[str]):
+    options = dict(zip(args[::2], args[1::2]))
+    mb = float(options.get("--mb", 4))
+    steps = int(options.get("--steps", 3))
+
+    sizes = [int(mb * 2**20 / 2**step) for step in reversed(range(steps))]
+    failed = False
+
+    for name, generate in SHAPES.items():
+        costs = []
+        for size in sizes:
+            code = generate(size)
+            try:
+                elapsed = measure(code)
+            except CompileError as error:
+                print(f"FAIL {name}: {error.errors[:3]}")
+                failed = True
+                break
+
+            megabytes = len(code) / 2**20
+            costs.append(elapsed / megabytes)
+            print(f"{name:12} {megabytes:8.2f} MB {elapsed:8.2f}s {costs[-1]:6.2f} s/MB")
+
+        if len(costs) == len(sizes) and costs[-1] > costs[0] * LINEAR_SLACK:
+            print(f"FAIL {name}: {costs[0]:.2f} -> {costs[-1]:.2f} s/MB")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
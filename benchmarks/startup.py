@@ -0,0 +1,125 @@
+"""
+Startup budget for plox.
+
+    python benchmarks/startup.py [--runs n]
+
+Checks that modules which are only needed by some scripts are not imported
+on startup, that importing the interpreter stays within IMPORT_BUDGET_MS
+(as reported by -X importtime), and reports the time from process start to
+the first executed statement compared with a bare python process. Exits
+with 1 when a budget is exceeded.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cumulative import time of src.lox.lox, in milliseconds
+IMPORT_BUDGET_MS = 25
+# time to first statement over a bare python process, in milliseconds
+STARTUP_BUDGET_MS = 30
+
+DEFERRED_MODULES = [
+    "typing",
+    "ast",
+    "curses",
+    "json",
+    "concurrent.futures",
+    "asyncio",
+    "src.lox.stdlib",
+    "src.lox.program",
+    "src.lox.modules",
+    "src.lox.batch",
+    "src.lox.check",
+    "src.lox.server",
+    "src.lox.async_interpreter",
+    "src.lox.repl",
+    "src.lox.memo",
+    "weakref",
+]
+
+
+def imported_modules() -> set[str]:
+    code = "import sys, src.lox.lox; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def import_time_ms() -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.lox.lox"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "src.lox.lox":
+            return int(parts[1]) / 1000
+
+    raise RuntimeError("src.lox.lox missing from -X importtime output")
+
+
+def first_output_ms(command: list[str]) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE)
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - start
+    process.stdout.read()
+    process.wait()
+    return elapsed * 1000
+
+
+def main(args: list[str]):
+    runs = int(args[1]) if len(args) == 2 and args[0] == "--runs" else 20
+    failed = False
+
+    loaded = imported_modules()
+    for module in DEFERRED_MODULES:
+        if module in loaded:
+            print(f"FAIL {module} is imported on startup")
+            failed = True
+
+    imports = statistics.median(import_time_ms() for _ in range(runs))
+    print(f"import src.lox.lox: {imports:.1f}ms (budget {IMPORT_BUDGET_MS}ms)")
+    failed = failed or imports > IMPORT_BUDGET_MS
+
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as script:
+        script.write('print "ready";\n')
+
+    try:
+        python = statistics.median(
+            first_output_ms([sys.executable, "-c", "print('ready')"])
+            for _ in range(runs)
+        )
+        plox = statistics.median(
+            first_output_ms([sys.executable, "-m", "src.lox.lox", script.name])
+            for _ in range(runs)
+        )
+    finally:
+        os.unlink(script.name)
+
+    overhead = plox - python
+    print(f"python to first output: {python:.1f}ms")
+    print(f"plox to first statement: {plox:.1f}ms")
+    print(f"overhead: {overhead:.1f}ms (budget {STARTUP_BUDGET_MS}ms)")
+    failed = failed or overhead > STARTUP_BUDGET_MS
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+"""
+Thread stress test for running one compiled program concurrently.
+
+    python benchmarks/threads.py [--threads n] [--runs n]
+
+Compiles a script once, runs it single threaded for each thread's expected
+output, then starts every thread at once, each running the shared program
+runs times. Exits with 1 when any run fails or prints something different.
+On free-threaded builds the runs execute in parallel.
+"""
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.lox.program import compile_source
+
+SCRIPT = """
+import "lib/strings.lox";
+
+fun fib(n) {
+  if (n <= 1) return n;
+  return fib(n - 2) + fib(n - 1);
+}
+
+fun counter() {
+  var count = 0;
+  fun increment() {
+    count = count + 1;
+    return count;
+  }
+  return increment;
+}
+
+fun range(n) {
+  for (var i = 0; i < n; i = i + 1) yield i;
+}
+
+class Account {
+  init(owner) {
+    this.owner = owner;
+    this.balance = 0;
+  }
+
+  deposit(amount) {
+    this.balance = this.balance + amount;
+    return this;
+  }
+}
+
+var next = counter();
+var totals = map();
+var text = "";
+for (var i in range(200)) {
+  set(totals, i - floor(i / 7) * 7, next());
+  text = text + repeat("x", 3);
+}
+
+var account = Account(seed);
+for (var i in range(50)) account.deposit(i);
+
+print fib(15);
+print values(totals);
+print len(text);
+print account.owner + " " + toString(account.balance);
+"""
+
+
+MODULES = os.path.join(ROOT, "lox-programs")
+
+
+def run(program, seed):
+    return program.run(globals={"seed": str(seed)}, base_dir=MODULES)
+
+
+def run_thread(program, seed, runs, expected, barrier, failures):
+    barrier.wait()
+    for _ in range(runs):
+        result = run(program, seed)
+        if not result.ok or result.output.getvalue() != expected:
+            failures.append((seed, result.errors, result.output.getvalue()))
+
+
+def main(args: list[str]):
+    options = dict(zip(args[::2], args[1::2]))
+    threads = int(options.get("--threads", 8))
+    runs = int(options.get("--runs", 10))
+
+    program = compile_source(SCRIPT)
+
+    expected = []
+    for seed in range(threads):
+        result = run(program, seed)
+        if not result.ok:
+            print(f"FAIL single threaded run: {result.errors}")
+            sys.exit(1)
+        expected.append(result.output.getvalue())
+
+    failures = []
+    barrier = threading.Barrier(threads)
+    workers = [
+        threading.Thread(
+            target=run_thread,
+            args=(program, seed, runs, expected[seed], barrier, failures),
+        )
+        for seed in range(threads)
+    ]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{threads} threads x {runs} runs in {elapsed:.2f}s (gil: {gil})")
+
+    for seed, errors, output in failures[:5]:
+        print(f"FAIL thread {seed}: {errors or output!r}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
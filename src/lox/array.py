@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from src.lox.exceptions import NativeException
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class LoxArray:
+    """
+    Built-in array backed by a python list.
+    """
+
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: list[Any]) -> None:
+        self.elements = elements
+
+    def index(self, index) -> int:
+        if type(index) is not float or not index.is_integer():
+            raise NativeException("Array index must be an integer.")
+
+        position = int(index)
+        if position < 0 or position >= len(self.elements):
+            raise NativeException("Array index out of range.")
+
+        return position
+
+    def get(self, index) -> Any:
+        return self.elements[self.index(index)]
+
+    def set(self, index, value):
+        self.elements[self.index(index)] = value
+
+    def __str__(self) -> str:
+        from src.lox.ast_printer import stringify
+
+        return "[" + ", ".join(map(stringify, self.elements)) + "]"
+
+
+__all__ = ["LoxArray"]
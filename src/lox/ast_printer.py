@@ -54,11 +54,15 @@ if __name__ == "__main__":
     printer.print(ast2)
 
 
+def format_error(error: Exception) -> str:
+    msg = str(error)
+    error_type = str(error.__class__.__name__)
+    return error_type + ": " + msg
+
+
 def print_errors(errors: list[Exception]):
     for error in errors:
-        msg = str(error)
-        error_type = str(error.__class__.__name__)
-        print(error_type + ": " + msg)
+        print(format_error(error))
 
 
 def stringify(value):
@@ -0,0 +1,395 @@
+"""
+Interpreter running as an asyncio coroutine, so many scripts can share one
+event loop.
+
+    results = await asyncio.gather(
+        *(program.run_async(globals={"fetch": fetch}) for program in programs)
+    )
+
+Execution hands control back to the loop every yield_every loop iterations
+or calls, so a busy script can't starve the others. Natives may be async
+functions, the script waits on them without blocking the loop.
+"""
+
+from __future__ import annotations
+import asyncio
+import sys
+
+from src.lox.array import LoxArray
+from src.lox.ast_printer import stringify
+from src.lox.callable import LoxClass, LoxFunction, LoxInstance, Return
+from src.lox.exceptions import (
+    BreakException,
+    NativeException,
+    RuntimeException,
+)
+from src.lox.expr import Binary
+from src.lox.ffi import ForeignFunction
+from src.lox.generator import Yielded
+from src.lox.interpreter import Interpreter
+from src.lox.memo import Memoized
+from src.lox.stmt import IfStmt
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+    from src.lox.env import Environment
+    from src.lox.expr import (
+        AnonymousFnExpr,
+        ArrayExpr,
+        Assignment,
+        Call,
+        Expr,
+        GetExpr,
+        Grouping,
+        IndexExpr,
+        IndexSetExpr,
+        Literal,
+        Logical,
+        SetExpr,
+        ThisExpr,
+        Unary,
+        Variable,
+    )
+    from src.lox.output import Output
+    from src.lox.stmt import (
+        BlockStmt,
+        BreakStmt,
+        ClassDeclStmt,
+        ForInStmt,
+        FunDeclStmt,
+        ImportStmt,
+        ReturnStmt,
+        Stmt,
+        VarDeclStmt,
+        WhileStmt,
+        YieldStmt,
+    )
+
+DEFAULT_YIELD_EVERY = 1000
+
+
+class AsyncInterpreter(Interpreter):
+    def __init__(
+        self,
+        env_global: Environment | None = None,
+        output: Output | None = None,
+        yield_every: int = DEFAULT_YIELD_EVERY,
+    ):
+        super().__init__(env_global, output)
+        self.yield_every = yield_every
+        # steps left before control goes back to the event loop
+        self.until_yield = yield_every
+
+    async def step(self, token):
+        self.ticks -= 1
+        if self.ticks <= 0:
+            self.check_limits(token)
+
+        self.until_yield -= 1
+        if self.until_yield <= 0:
+            self.until_yield = self.yield_every
+            await asyncio.sleep(0)
+
+    async def evaluate(self, stmt: Stmt | Expr):
+        return await stmt.accept(self)
+
+    ## ----------- statements start ----------------
+    async def visit_var_decl_stmt(self, stmt: VarDeclStmt):
+        value = None
+        if stmt.expr is not None:
+            value = await self.evaluate(stmt.expr)
+
+        self.define(stmt.identifier, value)
+
+    async def visit_expr_stmt(self, expr_stmt):
+        await self.evaluate(expr_stmt.expr)
+
+    async def visit_print_stmt(self, print_stmt):
+        result = await self.evaluate(print_stmt.expr)
+        self.output.write_line(stringify(result))
+
+    async def visit_block_stmt(self, stmt: BlockStmt):
+        if not stmt.scoped:
+            for statement in stmt.statements:
+                await self.evaluate(statement)
+            return
+
+        await self.execute_frame(stmt.statements, self.take_frame(self.env))
+
+    async def execute_block(self, statements: list[Stmt], env: Environment):
+        previous = self.env
+        self.env = env
+        try:
+            for statement in statements:
+                await self.evaluate(statement)
+        finally:
+            self.env = previous
+
+    async def execute_frame(self, statements: list[Stmt], env: Environment):
+        previous = self.env
+        self.env = env
+        try:
+            for statement in statements:
+                await self.evaluate(statement)
+        finally:
+            self.env = previous
+            self.release_frame(env)
+
+    async def visit_if_stmt(self, stmt: IfStmt):
+        while not await self.evaluate(stmt.condition):
+            stmt = stmt.else_branch
+            if type(stmt) is not IfStmt:
+                if stmt is not None:
+                    await self.evaluate(stmt)
+                return
+
+        await self.evaluate(stmt.then_branch)
+
+    async def visit_while_stmt(self, stmt: WhileStmt):
+        try:
+            while await self.evaluate(stmt.condition):
+                await self.step(stmt.token)
+                await self.evaluate(stmt.body)
+        except BreakException:
+            pass
+
+    async def visit_for_in_stmt(self, stmt: ForInStmt):
+        iterator = self.iterate(stmt, await self.evaluate(stmt.iterable))
+        body = (stmt.body,)
+        try:
+            for value in iterator:
+                await self.step(stmt.token)
+                await self.execute_frame(body, self.loop_scope(stmt, value))
+        except BreakException:
+            pass
+        except NativeException as exc:
+            raise RuntimeException(stmt.token, str(exc))
+        except RecursionError:
+            raise self.too_deep(stmt.token)
+
+    async def visit_yield_stmt(self, stmt: YieldStmt):
+        super().visit_yield_stmt(stmt)
+
+    async def visit_break_stmt(self, stmt: BreakStmt):
+        raise BreakException()
+
+    async def visit_fun_decl(self, stmt: FunDeclStmt):
+        super().visit_fun_decl(stmt)
+
+    async def visit_class_decl(self, stmt: ClassDeclStmt):
+        superclass = None
+        if stmt.superclass is not None:
+            superclass = await self.evaluate(stmt.superclass)
+
+        self.declare_class(stmt, superclass)
+
+    async def visit_return_stmt(self, stmt: ReturnStmt):
+        raise Return(
+            await self.evaluate(stmt.value) if stmt.value is not None else None
+        )
+
+    async def visit_import_stmt(self, stmt: ImportStmt):
+        module = self.load_import(stmt)
+        if module is None:
+            return
+
+        env = self.begin_import(module)
+        try:
+            await self.execute_block(module.statements, env)
+        finally:
+            self.end_import()
+
+        self.export_import(module, env)
+
+    ## ----------- statements end -------------------
+
+    ## ----------- expressions start ----------------
+    async def visit_variable(self, expr: Variable):
+        return super().visit_variable(expr)
+
+    async def visit_this_expr(self, expr: ThisExpr):
+        return self.look_var(expr, expr.token)
+
+    async def visit_assignment(self, expr: Assignment):
+        return self.assign(expr, await self.evaluate(expr.value))
+
+    async def visit_call(self, expr: Call) -> Any:
+        callee = await self.evaluate(expr.callee)
+
+        await self.step(expr.token)
+
+        self.check_callable(expr, callee)
+
+        args = [await self.evaluate(arg) for arg in expr.arguments]
+
+        self.check_depth(expr)
+
+        self.depth += 1
+        try:
+            return await self.call(callee, args)
+        except NativeException as exc:
+            raise RuntimeException(expr.token, str(exc))
+        except RecursionError:
+            raise self.too_deep(expr.token)
+        finally:
+            self.depth -= 1
+
+    async def call(self, callee, args: list[Any]) -> Any:
+        if type(callee) is LoxFunction and not callee.funStmt.is_generator:
+            return await self.call_function(callee, args)
+
+        if type(callee) is LoxClass:
+            instance = LoxInstance(callee)
+            initializer = callee.get_method("init")
+            if initializer is not None:
+                await self.call_function(initializer.bind(instance), args)
+            return instance
+
+        if type(callee) is Memoized:
+            return await callee.call_async(self, args)
+
+        if type(callee) is ForeignFunction:
+            return await callee.call_async(self, args)
+
+        return callee.call(self, args)
+
+    async def call_function(self, function: LoxFunction, args: list[Any]):
+        try:
+            await self.execute_frame(
+                function.funStmt.body, function.frame(self, args)
+            )
+        except Return as ret:
+            return ret.value
+
+    async def visit_anonymous_fn(self, expr: AnonymousFnExpr):
+        return LoxFunction(expr, self.capture(expr))
+
+    async def visit_literal(self, expr: Literal):
+        return expr.value
+
+    async def visit_grouping(self, expr: Grouping):
+        return await self.evaluate(self.ungroup(expr))
+
+    async def visit_binary(self, expr: Binary):
+        return await self.evaluate_chain(expr)
+
+    async def visit_logical(self, expr: Logical):
+        return await self.evaluate_chain(expr)
+
+    async def evaluate_chain(self, expr: Binary | Logical):
+        chain = self.operator_chain(expr)
+        value = await self.evaluate(chain[-1].left)
+        for node in reversed(chain):
+            if type(node) is Binary:
+                value = self.binary(node, value, await self.evaluate(node.right))
+            elif not self.short_circuits(node, value):
+                value = await self.evaluate(node.right)
+        return value
+
+    async def visit_unary(self, expr: Unary):
+        return self.unary(expr, await self.evaluate(expr.right))
+
+    async def visit_get_expr(self, expr: GetExpr):
+        return self.get_property(expr, await self.evaluate(expr.object))
+
+    async def visit_set_expr(self, expr: SetExpr):
+        object = await self.evaluate(expr.object)
+        self.check_instance(expr, object)
+
+        value = await self.evaluate(expr.value)
+        object.set(expr.property_name.lexeme, value)
+        return value
+
+    async def visit_array_expr(self, expr: ArrayExpr):
+        return LoxArray([await self.evaluate(element) for element in expr.elements])
+
+    async def visit_index_expr(self, expr: IndexExpr):
+        container = await self.evaluate(expr.object)
+        index = await self.evaluate(expr.index)
+        self.check_container(expr, container)
+
+        return self.get_index(expr, container, index)
+
+    async def visit_index_set_expr(self, expr: IndexSetExpr):
+        container = await self.evaluate(expr.object)
+        index = await self.evaluate(expr.index)
+        self.check_container(expr, container)
+
+        return self.set_index(
+            expr, container, index, await self.evaluate(expr.value)
+        )
+
+    ## ----------- expressions end ----------------
+
+    async def interpret(self, stmts: list[Stmt]):
+        self.start_limits()
+        self.until_yield = self.yield_every
+        try:
+            for stmt in stmts:
+                await self.evaluate(stmt)
+        except RuntimeException as exp:
+            self.errors = [exp]
+        except RecursionError as exp:
+            # nested too deep outside of any call, like printing a deeply
+            # nested array
+            self.errors = [exp]
+        finally:
+            self.end_limits()
+            self.output.flush()
+
+
+class GeneratorRunner(AsyncInterpreter):
+    """
+    Evaluates one generator's body, suspending the coroutine at each yield.
+    Program state is taken over from the interpreter resuming the generator.
+    """
+
+    # limit bookkeeping carried between the runner and its interpreter
+    LIMIT_STATE = ("ticks", "steps", "interval", "deadline", "heap_start")
+
+    def __init__(self, interpreter: Interpreter):
+        super().__init__(interpreter.env_global, interpreter.output, sys.maxsize)
+        self.parent = interpreter
+
+    def enter(self):
+        parent = self.parent
+        self.bindings = parent.bindings
+        self.captures = parent.captures
+        self.cells = parent.cells
+        self.global_slots = parent.global_slots
+        self.env_global = parent.env_global
+        self.output = parent.output
+        self.base_dir = parent.base_dir
+        self.importing = parent.importing
+        self.imported = parent.imported
+        self.limits = parent.limits
+        self.max_depth = parent.max_depth
+        self.depth = parent.depth
+        self.ticks = parent.ticks
+        if parent.limits is not None:
+            for name in self.LIMIT_STATE:
+                setattr(self, name, getattr(parent, name))
+
+    def leave(self):
+        parent = self.parent
+        parent.ticks = self.ticks
+        if parent.limits is not None:
+            for name in self.LIMIT_STATE:
+                setattr(parent, name, getattr(self, name))
+
+    async def run_body(self, statements: list[Stmt], env: Environment):
+        try:
+            await self.execute_block(statements, env)
+        except Return:
+            pass
+
+    async def visit_yield_stmt(self, stmt: YieldStmt):
+        value = None
+        if stmt.value is not None:
+            value = await self.evaluate(stmt.value)
+
+        await Yielded(value)
+
+
+__all__ = ["AsyncInterpreter", "DEFAULT_YIELD_EVERY", "GeneratorRunner"]
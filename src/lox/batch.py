@@ -0,0 +1,192 @@
+"""
+Run many independent scripts across processes, `plox run-many`.
+
+    plox run-many [--jobs n] [--timeout seconds] [--max-steps n]
+                  [--max-depth n] [--json] [--show-output] paths...
+
+Paths may be files, directories (searched for .lox files) or glob patterns.
+Every script runs in a pooled worker process with its output captured,
+bounded by the steps and call depth limits.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import json
+import os
+import signal
+import sys
+import time
+
+from src.lox.ast_printer import format_error
+from src.lox.limits import Limits
+from src.lox.output import MemoryOutput
+from src.lox.program import CompileError, compile_source
+
+
+class ScriptTimeout(BaseException):
+    """
+    Raised from the alarm handler. Not an Exception, so the interpreter's
+    own error handling can't swallow it.
+    """
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    paths = []
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.lox"), recursive=True)
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern, recursive=True)
+        else:
+            matches = [pattern]
+        paths.extend(sorted(matches))
+
+    return paths
+
+
+def on_timeout(signum, frame):
+    raise ScriptTimeout()
+
+
+def run_script(path: str, timeout: float | None, limits: Limits) -> dict:
+    """
+    Run one script in the current process. Returns its status, exit code,
+    captured output and duration.
+    """
+    output = MemoryOutput()
+    status, exit_code = "ok", 0
+    start = time.perf_counter()
+
+    if timeout is not None:
+        signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            source = file.read()
+
+        result = compile_source(source).run(
+            output=output,
+            base_dir=os.path.dirname(os.path.abspath(path)),
+            limits=limits,
+        )
+        if not result.ok:
+            status, exit_code = "runtime error", 70
+            for error in result.errors:
+                output.write_line(format_error(error))
+    except CompileError as error:
+        status, exit_code = "compile error", 65
+        for err in error.errors:
+            output.write_line(format_error(err))
+    except (OSError, UnicodeDecodeError) as error:
+        status, exit_code = "io error", 66
+        output.write_line(str(error))
+    except ScriptTimeout:
+        status, exit_code = "timeout", 70
+        output.write_line(f"Timed out after {timeout}s")
+    except RecursionError:
+        status, exit_code = "runtime error", 70
+        output.write_line("Maximum recursion depth exceeded")
+    except Exception as error:
+        # anything else fails this script only, never the whole batch
+        status, exit_code = "error", 70
+        output.write_line(format_error(error))
+    finally:
+        if timeout is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        "path": path,
+        "status": status,
+        "exit": exit_code,
+        "duration": time.perf_counter() - start,
+        "output": output.getvalue(),
+    }
+
+
+def run_many(paths: list[str], jobs: int, timeout: float | None, limits: Limits):
+    """
+    Yield results of paths in completion order.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(run_script, path, timeout, limits): path for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error:
+                # the worker process died, BrokenProcessPool fails every
+                # script that was still pending in it
+                yield {
+                    "path": futures[future],
+                    "status": "error",
+                    "exit": 70,
+                    "duration": 0.0,
+                    "output": format_error(error) + "\n",
+                }
+
+
+def main(args: list[str]):
+    jobs = os.cpu_count() or 1
+    timeout = None
+    limits = Limits()
+    as_json = False
+    show_output = False
+    patterns = []
+
+    args = iter(args)
+    for arg in args:
+        if arg == "--jobs":
+            jobs = int(next(args, jobs))
+        elif arg == "--timeout":
+            timeout = float(next(args, 0)) or None
+        elif arg == "--max-steps":
+            limits.max_steps = int(next(args, 0)) or None
+        elif arg == "--max-depth":
+            limits.max_depth = int(next(args, 0)) or None
+        elif arg == "--json":
+            as_json = True
+        elif arg == "--show-output":
+            show_output = True
+        else:
+            patterns.append(arg)
+
+    paths = expand_paths(patterns)
+    if len(paths) == 0:
+        print(
+            "Usage: plox run-many [--jobs n] [--timeout seconds] [--max-steps n] "
+            "[--max-depth n] [--json] [--show-output] paths..."
+        )
+        sys.exit(64)
+
+    start = time.perf_counter()
+    results = []
+    for result in run_many(paths, jobs, timeout, limits):
+        results.append(result)
+        if not as_json:
+            print(
+                f"{result['status'].upper():<14} {result['path']} "
+                f"({result['duration']:.3f}s)"
+            )
+            if show_output or result["exit"] != 0:
+                sys.stdout.write(result["output"])
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary = {
+        "scripts": len(results),
+        "statuses": counts,
+        "duration": time.perf_counter() - start,
+    }
+
+    if as_json:
+        json.dump({"results": results, "summary": summary}, sys.stdout, indent=2)
+        print()
+    else:
+        statuses = ", ".join(f"{count} {status}" for status, count in counts.items())
+        print(f"{len(results)} scripts in {summary['duration']:.3f}s: {statuses}")
+
+    sys.exit(max(result["exit"] for result in results))
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, TYPE_CHECKING
 
-from src.lox.env import Environment
+from src.lox.env import Cell, Environment
+from src.lox.generator import LoxGenerator
 
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from src.lox.token import Token
     from src.lox.expr import AnonymousFnExpr
     from src.lox.interpreter import Interpreter
@@ -39,16 +41,31 @@ class LoxFunction(Callable):
         self.closure = closure
 
     def call(self, interpreter: Interpreter, args: list[Any]) -> Any:
-        env = Environment(self.closure)
+        env = self.frame(interpreter, args)
 
-        for i, param in enumerate(self.funStmt.params):
-            env.put(param.lexeme, args[i])
+        if self.funStmt.is_generator:
+            return LoxGenerator(interpreter, self, env)
 
         try:
-            interpreter.execute_block(self.funStmt.body, env)
+            interpreter.execute_frame(self.funStmt.body, env)
         except Return as ret:
             return ret.value
 
+    def frame(self, interpreter: Interpreter, args: list[Any]) -> Environment:
+        """
+        Environment of a call, parameters bound to args. Generators keep
+        theirs, other calls release it once they return.
+        """
+        env = interpreter.take_frame(self.closure)
+
+        for i, param in enumerate(self.funStmt.params):
+            value = args[i]
+            if param in interpreter.cells:
+                value = Cell(value)
+            env.put(param.lexeme, value)
+
+        return env
+
     def bind(self, instance: LoxInstance) -> LoxFunction:
         closure = Environment(self.closure)
         closure.put("this", instance)
@@ -0,0 +1,110 @@
+"""
+Static check of scripts without running them, `plox check`.
+
+    plox check [--jobs n] paths...
+
+Every file is scanned, parsed and resolved in a pool of worker processes.
+Diagnostics are streamed to stdout as JSON lines, a summary goes to stderr.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import sys
+
+from src.lox.batch import expand_paths
+from src.lox.program import CompileError, front_end
+from src.lox.scanner import TokenError
+
+
+def diagnostic(path: str, error: Exception) -> dict:
+    if isinstance(error, TokenError):
+        line, lexeme = error.line, error.char
+    else:
+        line, lexeme = error.token.line, error.token.lexeme
+
+    return {
+        "path": path,
+        "kind": error.__class__.__name__,
+        "line": line,
+        "lexeme": lexeme,
+        "message": error.msg,
+    }
+
+
+def check_file(path: str) -> list[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            source = file.read()
+    except (OSError, UnicodeDecodeError) as error:
+        return [
+            {
+                "path": path,
+                "kind": error.__class__.__name__,
+                "line": 0,
+                "lexeme": "",
+                "message": str(error),
+            }
+        ]
+
+    try:
+        front_end(source)
+    except CompileError as error:
+        return [diagnostic(path, err) for err in error.errors]
+    except RecursionError:
+        return [
+            {
+                "path": path,
+                "kind": "RecursionError",
+                "line": 0,
+                "lexeme": "",
+                "message": "Nesting too deep.",
+            }
+        ]
+
+    return []
+
+
+def check_files(paths: list[str], jobs: int):
+    """
+    Yield diagnostics of every path, in path order.
+    """
+    if jobs <= 1:
+        yield from map(check_file, paths)
+        return
+
+    chunksize = max(1, min(256, len(paths) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(check_file, paths, chunksize=chunksize)
+
+
+def main(args: list[str]):
+    jobs = os.cpu_count() or 1
+    patterns = []
+
+    args = iter(args)
+    for arg in args:
+        if arg == "--jobs":
+            jobs = int(next(args, jobs))
+        else:
+            patterns.append(arg)
+
+    paths = expand_paths(patterns)
+    if len(paths) == 0:
+        print("Usage: plox check [--jobs n] paths...")
+        sys.exit(64)
+
+    failed = 0
+    count = 0
+    for diagnostics in check_files(paths, jobs):
+        if diagnostics:
+            failed += 1
+        for diag in diagnostics:
+            count += 1
+            sys.stdout.write(json.dumps(diag) + "\n")
+
+    print(
+        f"checked {len(paths)} files, {count} diagnostics in {failed} files",
+        file=sys.stderr,
+    )
+    sys.exit(65 if failed else 0)
@@ -0,0 +1,65 @@
+"""
+Tiny client for `plox --serve`. Imports nothing from the interpreter so it
+starts as fast as python does.
+
+    python -m src.lox.client [--socket path] script [args...]
+"""
+
+import json
+import os
+import socket
+import sys
+
+
+def default_socket_path() -> str:
+    return os.environ.get("PLOX_SOCKET", f"/tmp/plox-{os.getuid()}.sock")
+
+
+def run_remote(socket_path: str, script: str, argv: list[str]) -> int:
+    """
+    Run script on the server, streaming its output to stdout. Returns the
+    script's exit code.
+    """
+    request = {"path": os.path.abspath(script), "argv": argv}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+        for line in sock.makefile("r", encoding="utf-8"):
+            frame = json.loads(line)
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            elif "exit" in frame:
+                return frame["exit"]
+
+    # server went away without reporting an exit code
+    return 70
+
+
+def main(args: list[str]):
+    socket_path = default_socket_path()
+
+    if len(args) >= 2 and args[0] == "--socket":
+        socket_path = args[1]
+        args = args[2:]
+
+    if len(args) == 0:
+        print("Usage: plox --client [--socket path] script [args...]")
+        sys.exit(64)
+
+    try:
+        code = run_remote(socket_path, args[0], args[1:])
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(
+            f"No plox server is listening on {socket_path}, "
+            "start one with plox --serve"
+        )
+        sys.exit(69)
+
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
 
+class Cell:
+    """
+    Shared box for a variable captured by a closure. The declaring scope and
+    every closure capturing the variable hold the same cell.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value=None):
+        self.value = value
+
+
 class Environment:
+    __slots__ = ("env", "parent")
+
     def __init__(self, parent: Environment | None = None):
         self.env = {}
         self.parent = parent
 
     def get(self, key: str):
-        if self.has(key):
-            return self.env[key]
-
-        if self.parent is not None:
-            return self.parent.get(key)
+        env = self
+        while env is not None:
+            values = env.env
+            if key in values:
+                value = values[key]
+                if type(value) is Cell:
+                    return value.value
+                return value
+            env = env.parent
 
         raise ValueError("value not present")
 
@@ -23,11 +41,17 @@ class Environment:
 
         return self.get(key)
 
+    def get_cell_at(self, pos: int, key: str):
+        """
+        Raw slot of key at given distance, without unwrapping cells.
+        """
+        return self.ancester(pos).env[key]
+
     def ancester(self, pos: int) -> Environment | None:
         env = self
 
         for i in range(pos):
-            env = self.parent
+            env = env.parent
 
         return env
 
@@ -35,12 +59,17 @@ class Environment:
         self.env[key] = value
 
     def assign(self, key: str, value):
-        if self.has(key):
-            self.put(key, value)
-            return
-
-        if self.parent is not None:
-            return self.parent.assign(key, value)
+        env = self
+        while env is not None:
+            values = env.env
+            if key in values:
+                current = values[key]
+                if type(current) is Cell:
+                    current.value = value
+                else:
+                    values[key] = value
+                return
+            env = env.parent
 
         raise ValueError("value not present")
 
@@ -53,8 +82,38 @@ class Environment:
         self.assign(key, value)
 
     def has(self, key: str) -> bool:
-        try:
-            self.env[key]
+        return key in self.env
+
+    def slot(self, key: str) -> Cell:
+        """
+        Cell of key in the nearest scope holding it. A plain value is boxed
+        in place, so reads and writes through the cell and the scope agree.
+        """
+        env = self
+        while env is not None:
+            values = env.env
+            if key in values:
+                value = values[key]
+                if type(value) is not Cell:
+                    value = values[key] = Cell(value)
+                return value
+            env = env.parent
+
+        raise ValueError("value not present")
+
+    def declare(self, key: str, value) -> bool:
+        """
+        Put key in this scope, reusing its cell when it is already boxed so
+        slots handed out for it stay valid. False when key is new here.
+        """
+        values = self.env
+        if key in values:
+            current = values[key]
+            if type(current) is Cell:
+                current.value = value
+            else:
+                values[key] = value
             return True
-        except Exception as _:
-            return False
+
+        values[key] = value
+        return False
@@ -4,6 +4,7 @@ from src.lox.token import Token
 class RuntimeException(Exception):
     def __init__(self, token: Token, msg: str, *args):
         self.token = token
+        self.msg = msg
         super().__init__(f"'{token.lexeme}' at line {token.line}, {msg}", *args)
 
 
@@ -15,5 +16,24 @@ class ReferenceException(RuntimeException):
     pass
 
 
+class LimitExceededException(RuntimeException):
+    """
+    Raised when a script exceeds one of the interpreter's execution limits,
+    limit names which one: "steps", "time", "depth" or "memory".
+    """
+
+    def __init__(self, token: Token, limit: str, msg: str, *args):
+        self.limit = limit
+        super().__init__(token, msg, *args)
+
+
+class NativeException(Exception):
+    """
+    Raised by natives, reported as a RuntimeException at the call site.
+    """
+
+    pass
+
+
 class BreakException(Exception):
     pass
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any
 from src.lox.token import Token, TokenType
 
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from src.lox.stmt import Stmt
 
 
@@ -56,14 +57,30 @@ class ExprVisitor(ABC):
     def visit_this_expr(self, expr: ThisExpr):
         pass
 
+    @abstractmethod
+    def visit_array_expr(self, expr: ArrayExpr):
+        pass
+
+    @abstractmethod
+    def visit_index_expr(self, expr: IndexExpr):
+        pass
+
+    @abstractmethod
+    def visit_index_set_expr(self, expr: IndexSetExpr):
+        pass
+
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: ExprVisitor) -> Any:
         pass
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
@@ -77,6 +94,8 @@ class Binary(Expr):
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
@@ -86,6 +105,8 @@ class Unary(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -97,6 +118,8 @@ class Literal(Expr):
 
 
 class Grouping(Expr):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
@@ -105,6 +128,8 @@ class Grouping(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, name: Token):
         self.name = name
 
@@ -113,6 +138,8 @@ class Variable(Expr):
 
 
 class Assignment(Expr):
+    __slots__ = ("name", "value")
+
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
@@ -122,6 +149,8 @@ class Assignment(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
         self.left = left
         self.operator = operator
@@ -132,6 +161,8 @@ class Logical(Expr):
 
 
 class Call(Expr):
+    __slots__ = ("callee", "arguments", "token", "inline")
+
     def __init__(
         self,
         callee: Expr,
@@ -141,21 +172,32 @@ class Call(Expr):
         self.callee = callee
         self.arguments = arguments
         self.token = token
+        # function whose returned expression is evaluated in place of a full
+        # call, when the callee turns out to be that function
+        self.inline: AnonymousFnExpr | None = None
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_call(self)
 
 
 class AnonymousFnExpr(Expr):
-    def __init__(self, params: list[Token], body: list[Stmt]) -> None:
+    __slots__ = ("params", "body", "is_generator", "__weakref__")
+
+    def __init__(
+        self, params: list[Token], body: list[Stmt], is_generator: bool = False
+    ) -> None:
         self.params = params
         self.body = body
+        # body yields, calls create a generator instead of running it
+        self.is_generator = is_generator
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_anonymous_fn(self)
 
 
 class GetExpr(Expr):
+    __slots__ = ("object", "property_name")
+
     def __init__(self, object: Expr, property_name: Token) -> None:
         self.object = object
         self.property_name = property_name
@@ -165,6 +207,8 @@ class GetExpr(Expr):
 
 
 class SetExpr(Expr):
+    __slots__ = ("object", "property_name", "value")
+
     def __init__(self, object: Expr, property_name: Token, value) -> None:
         self.object = object
         self.property_name = property_name
@@ -175,8 +219,47 @@ class SetExpr(Expr):
 
 
 class ThisExpr(Expr):
+    __slots__ = ("token",)
+
     def __init__(self, token: Token) -> None:
         self.token = token
 
     def accept(self, visitor: ExprVisitor) -> Any:
         return visitor.visit_this_expr(self)
+
+
+class ArrayExpr(Expr):
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: list[Expr]) -> None:
+        self.elements = elements
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_array_expr(self)
+
+
+class IndexExpr(Expr):
+    __slots__ = ("object", "index", "token")
+
+    def __init__(self, object: Expr, index: Expr, token: Token) -> None:
+        self.object = object
+        self.index = index
+        self.token = token
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_index_expr(self)
+
+
+class IndexSetExpr(Expr):
+    __slots__ = ("object", "index", "value", "token")
+
+    def __init__(
+        self, object: Expr, index: Expr, value: Expr, token: Token
+    ) -> None:
+        self.object = object
+        self.index = index
+        self.value = value
+        self.token = token
+
+    def accept(self, visitor: ExprVisitor) -> Any:
+        return visitor.visit_index_set_expr(self)
@@ -0,0 +1,199 @@
+"""
+Exposing python callables to Lox scripts.
+
+    interpreter.define_native("greet", lambda name: "hello " + name)
+
+    @interpreter.native(arg_types=(str, int))
+    def repeat(text, times):
+        return text * times
+
+Arguments are passed as Lox values unless arg_types asks for a conversion,
+return values are converted back into Lox values. Raise NativeException to
+report a runtime error at the call site, any other exception is reported as
+one naming the function and the exception.
+"""
+
+from __future__ import annotations
+
+from src.lox.array import LoxArray
+from src.lox.callable import Callable, LoxInstance
+from src.lox.exceptions import NativeException
+from src.lox.generator import LoxGenerator
+from src.lox.hashmap import LoxMap
+from src.lox.natives import Native
+from src.lox.rope import Rope
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable as PyCallable
+    from src.lox.expr import Expr
+    from src.lox.interpreter import Interpreter
+
+
+# values scripts already work with, passed back unchanged
+LOX_VALUES = (Rope, LoxArray, LoxMap, LoxInstance, LoxGenerator, Callable)
+
+
+def to_lox(value) -> Any:
+    _type = type(value)
+    if value is None or _type is float or _type is str or _type is bool:
+        return value
+    if _type is int:
+        return float(value)
+    if _type is list or _type is tuple:
+        return LoxArray([to_lox(element) for element in value])
+    if _type is dict:
+        lox_map = LoxMap()
+        for key, element in value.items():
+            lox_map.set(to_lox(key), to_lox(element))
+        return lox_map
+    if isinstance(value, LOX_VALUES):
+        return value
+
+    raise NativeException(f"Unsupported return type {_type.__name__}.")
+
+
+def from_lox(value, _type) -> Any:
+    if _type is None or _type is object:
+        return value
+    if _type is float:
+        if type(value) is not float:
+            raise NativeException("Expected a number.")
+        return value
+    if _type is int:
+        if type(value) is not float or not value.is_integer():
+            raise NativeException("Expected an integer.")
+        return int(value)
+    if _type is str:
+        if type(value) is Rope:
+            return str(value)
+        if type(value) is not str:
+            raise NativeException("Expected a string.")
+        return value
+    if _type is bool:
+        if type(value) is not bool:
+            raise NativeException("Expected a boolean.")
+        return value
+    if _type is list:
+        if type(value) is not LoxArray:
+            raise NativeException("Expected an array.")
+        return list(value.elements)
+    if _type is dict:
+        if type(value) is not LoxMap:
+            raise NativeException("Expected a map.")
+        return dict(zip(value.keys(), value.values()))
+
+    raise TypeError(f"Unsupported argument type {_type!r}")
+
+
+class ForeignFunction(Native):
+    """
+    Python callable registered as a Lox native.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: PyCallable,
+        arity: int,
+        arg_types: tuple | None = None,
+    ) -> None:
+        super().__init__(arity)
+        self.name = name
+        self.function = function
+        self.argc = arity
+        self.arg_types = arg_types
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        if self.arg_types is not None:
+            args = [
+                from_lox(arg, _type) for arg, _type in zip(args, self.arg_types)
+            ]
+        return self.invoke(*args)
+
+    async def call_async(self, interpreter, args: list[Any]) -> Any:
+        """
+        call for the async interpreter, awaiting the result of async
+        callables.
+        """
+        if self.arg_types is not None:
+            args = [
+                from_lox(arg, _type) for arg, _type in zip(args, self.arg_types)
+            ]
+        try:
+            result = self.function(*args)
+            if hasattr(result, "__await__"):
+                result = await result
+            return to_lox(result)
+        except NativeException:
+            raise
+        except Exception as exc:
+            raise self.failure(exc) from exc
+
+    def invoke(self, *args) -> Any:
+        try:
+            return to_lox(self.function(*args))
+        except NativeException:
+            raise
+        except Exception as exc:
+            raise self.failure(exc) from exc
+
+    def failure(self, exc: Exception) -> NativeException:
+        """
+        Runtime error for an exception the python callable raised.
+        """
+        return NativeException(f"{self.name} raised {type(exc).__name__}: {exc}")
+
+    def call_direct(self, interpreter: Interpreter, arguments: list[Expr]):
+        """
+        Evaluate arguments and call, without an intermediate argument list.
+        Arity is checked by the caller.
+        """
+        if self.arg_types is not None:
+            return self.call(
+                interpreter, [interpreter.evaluate(arg) for arg in arguments]
+            )
+
+        evaluate = interpreter.evaluate
+
+        match self.argc:
+            case 0:
+                return self.invoke()
+            case 1:
+                return self.invoke(evaluate(arguments[0]))
+            case 2:
+                return self.invoke(evaluate(arguments[0]), evaluate(arguments[1]))
+            case 3:
+                return self.invoke(
+                    evaluate(arguments[0]),
+                    evaluate(arguments[1]),
+                    evaluate(arguments[2]),
+                )
+            case _:
+                return self.invoke(*[evaluate(arg) for arg in arguments])
+
+    def __str__(self) -> str:
+        return "<native fn " + self.name + ">"
+
+
+def make_native(
+    name: str,
+    function: PyCallable,
+    arity: int | None = None,
+    arg_types: tuple | None = None,
+) -> ForeignFunction:
+    if arity is None:
+        if arg_types is not None:
+            arity = len(arg_types)
+        else:
+            import inspect
+
+            arity = len(inspect.signature(function).parameters)
+
+    if arg_types is not None and len(arg_types) != arity:
+        raise ValueError("arg_types must have one entry per argument")
+
+    return ForeignFunction(name, function, arity, arg_types)
+
+
+__all__ = ["ForeignFunction", "make_native", "to_lox", "from_lox"]
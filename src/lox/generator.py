@@ -0,0 +1,133 @@
+"""
+Generators, created by calling a function whose body yields.
+
+    fun evens(n) {
+      for (var i = 0; i < n; i = i + 2) yield i;
+    }
+
+    for (var x in evens(10)) print x;
+
+The body runs lazily, up to the next yield, whenever a value is asked for.
+It is evaluated as a coroutine, so a suspended generator is just its
+coroutine frames and environments, no thread or copied stack.
+"""
+
+from __future__ import annotations
+
+from src.lox.exceptions import NativeException
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from src.lox.callable import LoxFunction
+    from src.lox.env import Environment
+    from src.lox.interpreter import Interpreter
+
+# marks an empty lookahead, nil is a valid yielded value
+NOTHING = object()
+
+
+class Yielded:
+    """
+    Awaited by a generator body to suspend it with value.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def __await__(self):
+        yield self
+
+
+class LoxGenerator:
+    def __init__(
+        self, interpreter: Interpreter, function: LoxFunction, env: Environment
+    ) -> None:
+        from src.lox.async_interpreter import GeneratorRunner
+
+        # the function keeps its body's resolution data alive
+        self.function = function
+        self.runner = GeneratorRunner(interpreter)
+        self.env = env
+        # coroutine running the body, created on first resume
+        self.body = None
+        self.finished = False
+        self.pending = NOTHING
+        self.running = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.fill():
+            raise StopIteration
+        value = self.pending
+        self.pending = NOTHING
+        return value
+
+    def next(self):
+        """
+        Next yielded value, NativeException once the body has finished.
+        """
+        try:
+            return self.__next__()
+        except StopIteration:
+            raise NativeException("Generator is exhausted.")
+
+    def done(self) -> bool:
+        """
+        Whether the body finished, runs it up to the next yield to find out.
+        """
+        return not self.fill()
+
+    def fill(self) -> bool:
+        """
+        Resume the body until it yields a value to pending. False when the
+        body finished instead.
+        """
+        if self.pending is not NOTHING:
+            return True
+        if self.finished:
+            return False
+        if self.running:
+            raise NativeException("Generator is already running.")
+
+        runner = self.runner
+        if self.body is None:
+            self.body = runner.run_body(self.function.funStmt.body, self.env)
+        runner.enter()
+        self.running = True
+        try:
+            signal = self.body.send(None)
+        except StopIteration:
+            self.finish()
+            return False
+        except BaseException:
+            self.finish()
+            raise
+        finally:
+            self.running = False
+            runner.leave()
+
+        if type(signal) is not Yielded:
+            self.body.close()
+            self.finish()
+            raise NativeException("Generators can't wait on async natives.")
+
+        self.pending = signal.value
+        return True
+
+    def finish(self):
+        # drop the suspended frames, a finished generator holds no state
+        self.finished = True
+        self.body = None
+        self.runner = None
+        self.env = None
+
+    def __str__(self) -> str:
+        name = self.function.name or "anonymous"
+        return "<generator " + name + ">"
+
+
+__all__ = ["LoxGenerator", "Yielded"]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from src.lox.exceptions import NativeException
+from src.lox.rope import Rope
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class BoolKey:
+    """
+    Map key standing in for a boolean, python treats True and 1.0 as the
+    same dict key while Lox does not.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool) -> None:
+        self.value = value
+
+
+BOOL_KEYS = {True: BoolKey(True), False: BoolKey(False)}
+
+
+class LoxMap:
+    """
+    Built-in hash map backed by a python dict. Keys are strings, numbers or
+    booleans.
+    """
+
+    __slots__ = ("entries",)
+
+    def __init__(self) -> None:
+        self.entries: dict[Any, Any] = {}
+
+    @staticmethod
+    def key(value) -> Any:
+        _type = type(value)
+        if _type is str or _type is float:
+            return value
+        if _type is bool:
+            return BOOL_KEYS[value]
+        if _type is Rope:
+            return str(value)
+
+        raise NativeException("Map keys must be strings, numbers or booleans.")
+
+    def get(self, key) -> Any:
+        try:
+            return self.entries[self.key(key)]
+        except KeyError:
+            raise NativeException("Undefined key.")
+
+    def set(self, key, value):
+        self.entries[self.key(key)] = value
+
+    def has(self, key) -> bool:
+        return self.key(key) in self.entries
+
+    def delete(self, key) -> bool:
+        return self.entries.pop(self.key(key), self) is not self
+
+    def keys(self) -> list[Any]:
+        return [
+            key.value if type(key) is BoolKey else key for key in self.entries
+        ]
+
+    def values(self) -> list[Any]:
+        return list(self.entries.values())
+
+    def __str__(self) -> str:
+        from src.lox.ast_printer import stringify
+
+        entries = zip(self.keys(), self.entries.values())
+        return (
+            "{"
+            + ", ".join(
+                stringify(key) + ": " + stringify(value)
+                for key, value in entries
+            )
+            + "}"
+        )
+
+
+__all__ = ["LoxMap"]
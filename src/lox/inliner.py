@@ -0,0 +1,183 @@
+"""
+Inlining of small top level functions at their call sites.
+
+    fun add(a, b) { return a + b; }
+    print add(1, 2);
+
+A function qualifies when it is declared once at top level, never
+assigned, its body is a single return of an expression of at most
+INLINE_BUDGET nodes without function expressions, none of its parameters
+is captured and it can't reach itself through other inlined functions.
+Calls of it with the right number of arguments evaluate the returned
+expression directly. Call sites check that the callee still is the
+declared function, any other value is called as usual.
+"""
+
+from __future__ import annotations
+
+from src.lox.expr import ExprVisitor, Variable
+from src.lox.stmt import FunDeclStmt, ReturnStmt
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from src.lox.expr import (
+        AnonymousFnExpr,
+        ArrayExpr,
+        Assignment,
+        Binary,
+        Call,
+        Expr,
+        GetExpr,
+        Grouping,
+        IndexExpr,
+        IndexSetExpr,
+        Literal,
+        Logical,
+        SetExpr,
+        ThisExpr,
+        Unary,
+    )
+    from src.lox.resolver import Resolver
+
+# most nodes in the returned expression of an inlined function
+INLINE_BUDGET = 16
+
+
+class TooLarge(Exception):
+    pass
+
+
+class ExprSize(ExprVisitor):
+    """
+    Counts the nodes of an expression, along with the globals it calls.
+    Raises TooLarge past the budget or on nodes that can't be inlined.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.left = budget
+        self.callees: set[str] = set()
+
+    def count(self, expr: Expr):
+        self.left -= 1
+        if self.left < 0:
+            raise TooLarge()
+        expr.accept(self)
+
+    def too_large(self, *_):
+        raise TooLarge()
+
+    def visit_binary(self, expr: Binary):
+        self.count(expr.left)
+        self.count(expr.right)
+
+    visit_logical = visit_binary
+
+    def visit_unary(self, expr: Unary):
+        self.count(expr.right)
+
+    def visit_grouping(self, expr: Grouping):
+        self.count(expr.expr)
+
+    def visit_literal(self, expr: Literal):
+        pass
+
+    def visit_variable(self, expr: Variable):
+        pass
+
+    def visit_assignment(self, expr: Assignment):
+        self.count(expr.value)
+
+    def visit_call(self, expr: Call):
+        if type(expr.callee) is Variable:
+            self.callees.add(expr.callee.name.lexeme)
+        self.count(expr.callee)
+        for argument in expr.arguments:
+            self.count(argument)
+
+    # functions would close over the inlined frame
+    visit_anonymous_fn = too_large
+    visit_this_expr = too_large
+
+    def visit_get_expr(self, expr: GetExpr):
+        self.count(expr.object)
+
+    def visit_set_expr(self, expr: SetExpr):
+        self.count(expr.object)
+        self.count(expr.value)
+
+    def visit_array_expr(self, expr: ArrayExpr):
+        for element in expr.elements:
+            self.count(element)
+
+    def visit_index_expr(self, expr: IndexExpr):
+        self.count(expr.object)
+        self.count(expr.index)
+
+    def visit_index_set_expr(self, expr: IndexSetExpr):
+        self.count(expr.object)
+        self.count(expr.index)
+        self.count(expr.value)
+
+
+def candidate(resolver: Resolver, stmt: FunDeclStmt) -> set[str] | None:
+    """
+    Globals called by the function stmt declares, None when it can't be
+    inlined.
+    """
+    fun = stmt.declaration
+    body = fun.body
+    if fun.is_generator or len(body) != 1:
+        return None
+    if type(body[0]) is not ReturnStmt or body[0].value is None:
+        return None
+    for param in fun.params:
+        if param in resolver.cells:
+            return None
+
+    size = ExprSize(INLINE_BUDGET)
+    try:
+        size.count(body[0].value)
+    except TooLarge:
+        return None
+    return size.callees
+
+
+def inline_calls(resolver: Resolver):
+    """
+    Mark the calls of qualifying top level functions resolver has seen.
+    """
+    candidates: dict[str, tuple[AnonymousFnExpr, set[str]]] = {}
+    for name, stmt in resolver.top_level.items():
+        if type(stmt) is not FunDeclStmt or name in resolver.rebound:
+            continue
+        callees = candidate(resolver, stmt)
+        if callees is not None:
+            candidates[name] = (stmt.declaration, callees)
+
+    # a function is inlined once every candidate it calls is, so functions
+    # on a cycle, directly recursive ones included, never are
+    callers: dict[str, list[str]] = {}
+    waiting: dict[str, int] = {}
+    for name, (_, callees) in candidates.items():
+        calls = [callee for callee in callees if callee in candidates]
+        waiting[name] = len(calls)
+        for callee in calls:
+            callers.setdefault(callee, []).append(name)
+
+    ready = [name for name, count in waiting.items() if count == 0]
+    inlined: dict[str, AnonymousFnExpr] = {}
+    while ready:
+        name = ready.pop()
+        inlined[name] = candidates[name][0]
+        for caller in callers.get(name, ()):
+            waiting[caller] -= 1
+            if waiting[caller] == 0:
+                ready.append(caller)
+
+    for call in resolver.global_calls:
+        fun = inlined.get(call.callee.name.lexeme)
+        if fun is not None and len(call.arguments) == len(fun.params):
+            call.inline = fun
+
+
+__all__ = ["INLINE_BUDGET", "inline_calls"]
@@ -1,8 +1,11 @@
 # type: ignore
 
-from ast import And
+from __future__ import annotations
 import operator
-from typing import Any
+import os
+import sys
+import time
+from src.lox.array import LoxArray
 from src.lox.ast_printer import stringify
 from src.lox.callable import (
     Callable,
@@ -11,14 +14,18 @@ from src.lox.callable import (
     LoxInstance,
     Return,
 )
-from src.lox.env import Environment
+from src.lox.env import Cell, Environment
 from src.lox.exceptions import (
     BreakException,
+    DivideByZeroException,
+    LimitExceededException,
+    NativeException,
     ReferenceException,
     RuntimeException,
 )
 from src.lox.expr import (
     AnonymousFnExpr,
+    ArrayExpr,
     Assignment,
     Binary,
     Call,
@@ -26,6 +33,8 @@ from src.lox.expr import (
     ExprVisitor,
     GetExpr,
     Grouping,
+    IndexExpr,
+    IndexSetExpr,
     Literal,
     Logical,
     SetExpr,
@@ -33,34 +42,243 @@ from src.lox.expr import (
     Unary,
     Variable,
 )
+from src.lox.ffi import ForeignFunction, make_native
+from src.lox.generator import LoxGenerator
+from src.lox.hashmap import LoxMap
+from src.lox.limits import DEFAULT_MAX_DEPTH, Limits
 from src.lox.natives import set_natives
+from src.lox.output import Output, StdoutOutput
+from src.lox.rope import Rope, concat, is_string
 from src.lox.stmt import (
     BlockStmt,
     BreakStmt,
     ClassDeclStmt,
+    ForInStmt,
     FunDeclStmt,
     IfStmt,
+    ImportStmt,
     ReturnStmt,
     Stmt,
     StmtVisitor,
     VarDeclStmt,
     WhileStmt,
+    YieldStmt,
 )
 from src.lox.token import TokenType, Token
 
+# python frames a nested Lox call may take, with room for the statements
+# and expressions around it
+FRAMES_PER_CALL = 32
+
+# most frames kept for reuse, enough for the call depth of typical recursion
+FRAME_POOL_SIZE = 256
+
+# comparisons a counted loop may test its variable with
+COUNTED_COMPARISONS = {
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
 
 class Interpreter(ExprVisitor, StmtVisitor):
-    def __init__(self):
+    """
+    Execution context of a single run. Resolution tables are only read, so
+    they can be shared by interpreters running in other threads, while the
+    environments, errors, output and limit counters here belong to one run.
+    Run a compiled Program to execute the same script from many threads.
+    """
+
+    def __init__(
+        self,
+        env_global: Environment | None = None,
+        output: Output | None = None,
+    ):
+        # shared, read only
         self.bindings = {}
+        self.captures = {}
+        self.cells = set()
+
+        # per run
         self.errors: [Exception] = []
-        self.env_global = Environment()
+        self.output: Output = output or StdoutOutput()
 
-        set_natives(self.env_global)
+        if env_global is None:
+            env_global = Environment()
+            set_natives(env_global)
+
+        self.env_global = env_global
 
         self.env = self.env_global
 
+        # directory relative imports of the main script resolve against,
+        # the working directory when None
+        self.base_dir: str | None = None
+        self.importing: list[str] = []
+        self.imported: set[str] = set()
+        self.previous_globals: list[Environment] = []
+        # cell each global variable site last resolved to
+        self.global_slots: dict[Expr, Cell] = {}
+        # reset environments of finished blocks and calls
+        self.frames: list[Environment] = []
+
+        self.limits: Limits | None = None
+        self.max_depth = DEFAULT_MAX_DEPTH
+        self.depth = 0
+        # steps left before limits are checked again
+        self.ticks = sys.maxsize
+        # whether the run raised python's recursion limit
+        self.raised_limit = False
+
     def set_bindings(self, bindings: dict):
         self.bindings = bindings
+        self.global_slots = {}
+
+    def define_native(
+        self,
+        name: str,
+        function,
+        arity: int | None = None,
+        arg_types: tuple | None = None,
+    ):
+        """
+        Expose python function to scripts as global name. Arity defaults to
+        the function's parameter count.
+        """
+        self.define_global(name, make_native(name, function, arity, arg_types))
+
+    def native(
+        self,
+        name: str | None = None,
+        arity: int | None = None,
+        arg_types: tuple | None = None,
+    ):
+        """
+        Decorator form of define_native.
+        """
+
+        def register(function):
+            self.define_native(
+                name or function.__name__, function, arity, arg_types
+            )
+            return function
+
+        return register
+
+    def set_limits(self, limits: Limits | None):
+        self.limits = limits
+        self.max_depth = DEFAULT_MAX_DEPTH
+        if limits is not None:
+            self.max_depth = limits.max_depth
+            if limits.max_depth is None:
+                self.max_depth = sys.maxsize
+
+    def start_limits(self):
+        self.depth = 0
+        self.ticks = sys.maxsize
+
+        # calls hit the depth limit well before python's recursion limit,
+        # which is raised for the run when needed and restored by end_limits
+        frames = self.max_depth * FRAMES_PER_CALL
+        self.raised_limit = (
+            self.max_depth < sys.maxsize and sys.getrecursionlimit() < frames
+        )
+        if self.raised_limit:
+            from src.lox.stack import raise_recursion_limit
+
+            raise_recursion_limit(frames)
+
+        limits = self.limits
+        if limits is None:
+            return
+
+        self.steps = 0
+        self.deadline = None
+        if limits.timeout is not None:
+            self.deadline = time.monotonic() + limits.timeout
+        self.heap_start = sys.getallocatedblocks()
+        self.reset_ticks()
+
+    def end_limits(self):
+        if self.raised_limit:
+            from src.lox.stack import restore_recursion_limit
+
+            self.raised_limit = False
+            restore_recursion_limit()
+
+    def reset_ticks(self):
+        limits = self.limits
+        self.interval = limits.check_interval
+        if limits.max_steps is not None:
+            self.interval = min(self.interval, limits.max_steps - self.steps)
+        self.ticks = self.interval
+
+    def check_limits(self, token: Token):
+        limits = self.limits
+        self.steps += self.interval
+
+        if limits.max_steps is not None and self.steps >= limits.max_steps:
+            raise LimitExceededException(
+                token, "steps", f"Exceeded {limits.max_steps} steps."
+            )
+
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise LimitExceededException(
+                token, "time", f"Exceeded {limits.timeout}s time limit."
+            )
+
+        if (
+            limits.max_heap_blocks is not None
+            and sys.getallocatedblocks() - self.heap_start
+            > limits.max_heap_blocks
+        ):
+            raise LimitExceededException(
+                token, "memory", "Exceeded memory limit."
+            )
+
+        self.reset_ticks()
+
+    def set_output(self, output: Output):
+        self.output.flush()
+        self.output = output
+
+    def set_captures(self, captures: dict, cells: set):
+        self.captures = captures
+        self.cells = cells
+
+    def define(self, name: Token, value):
+        if self.env is self.env_global:
+            self.define_global(name.lexeme, value)
+            return
+
+        if name in self.cells:
+            value = Cell(value)
+        self.env.put(name.lexeme, value)
+
+    def define_global(self, name: str, value):
+        # a new name in module globals may shadow one sites already cached
+        env = self.env_global
+        if not env.declare(name, value) and env.parent is not None:
+            self.global_slots.clear()
+
+    def capture(self, fun: AnonymousFnExpr) -> Environment:
+        """
+        Closure environment holding only the cells captured by fun.
+        """
+        captures = self.captures.get(fun)
+        if not captures:
+            return self.env_global
+
+        closure = Environment(self.env_global)
+        for name, distance in captures.items():
+            closure.put(name, self.env.get_cell_at(distance, name))
+
+        return closure
 
     def evaluate(self, stmt: Stmt | Expr):
         return stmt.accept(self)
@@ -71,17 +289,22 @@ class Interpreter(ExprVisitor, StmtVisitor):
         if stmt.expr is not None:
             value = self.evaluate(stmt.expr)
 
-        self.env.put(stmt.identifier.lexeme, value)
+        self.define(stmt.identifier, value)
 
     def visit_expr_stmt(self, expr_stmt):
         self.evaluate(expr_stmt.expr)
 
     def visit_print_stmt(self, print_stmt):
         result = self.evaluate(print_stmt.expr)
-        print(stringify(result))
+        self.output.write_line(stringify(result))
 
     def visit_block_stmt(self, stmt: BlockStmt):
-        self.execute_block(stmt.statements, Environment(self.env))
+        if not stmt.scoped:
+            for statement in stmt.statements:
+                self.evaluate(statement)
+            return
+
+        self.execute_frame(stmt.statements, self.take_frame(self.env))
 
     def execute_block(self, statements: list[Stmt], env: Environment):
         previous = self.env
@@ -92,50 +315,278 @@ class Interpreter(ExprVisitor, StmtVisitor):
         finally:
             self.env = previous
 
+    def execute_frame(self, statements: list[Stmt], env: Environment):
+        """
+        execute_block in a frame from take_frame, released when done.
+        """
+        previous = self.env
+        self.env = env
+        try:
+            for statement in statements:
+                self.evaluate(statement)
+        finally:
+            self.env = previous
+            # release_frame, inlined on the hot path
+            frames = self.frames
+            if len(frames) < FRAME_POOL_SIZE:
+                env.env.clear()
+                env.parent = None
+                frames.append(env)
+
+    def take_frame(self, parent: Environment) -> Environment:
+        """
+        Empty environment for a block or call, reused from finished ones.
+        """
+        frames = self.frames
+        if frames:
+            env = frames.pop()
+            env.parent = parent
+            return env
+        return Environment(parent)
+
+    def release_frame(self, env: Environment):
+        # closures hold captured cells, never the environment itself, so
+        # nothing can see a frame once its block or call is over
+        frames = self.frames
+        if len(frames) < FRAME_POOL_SIZE:
+            env.env.clear()
+            env.parent = None
+            frames.append(env)
+
     def visit_if_stmt(self, stmt: IfStmt):
-        if self.evaluate(stmt.condition):
-            self.evaluate(stmt.then_branch)
-        elif stmt.else_branch is not None:
-            self.evaluate(stmt.else_branch)
+        # else if chains are followed in a loop
+        while not self.evaluate(stmt.condition):
+            stmt = stmt.else_branch
+            if type(stmt) is not IfStmt:
+                if stmt is not None:
+                    self.evaluate(stmt)
+                return
+
+        self.evaluate(stmt.then_branch)
 
     def visit_while_stmt(self, stmt: WhileStmt):
+        if stmt.counted is not None and self.run_counted(stmt):
+            return
+
         try:
             while self.evaluate(stmt.condition):
+                self.ticks -= 1
+                if self.ticks <= 0:
+                    self.check_limits(stmt.token)
                 self.evaluate(stmt.body)
         except BreakException as exc:
             pass
 
+    def run_counted(self, stmt: WhileStmt) -> bool:
+        """
+        Run a counted for loop in a python loop, updating its variable in
+        place. False, before the first iteration, when the variable is
+        captured or not a number and the loop must run as written.
+        """
+        counted = stmt.counted
+        name = counted.name.lexeme
+        values = self.env.env
+        value = values.get(name)
+        if type(value) is not float or counted.name in self.cells:
+            return False
+
+        # a bound in a local nobody else can assign is read once, globals
+        # and captured variables may change in calls from the body
+        bound = counted.bound
+        limit = None
+        if type(bound) is Literal:
+            limit = bound.value
+        else:
+            distance = self.bindings.get(bound)
+            if distance is not None:
+                slot = self.env.get_cell_at(distance, bound.name.lexeme)
+                if type(slot) is float:
+                    limit = slot
+                elif type(slot) is not Cell:
+                    return False
+
+        compare = COUNTED_COMPARISONS[counted.operator]
+        body = counted.body
+        step = counted.step
+        try:
+            while True:
+                current = limit if limit is not None else self.evaluate(bound)
+                if type(current) is not float:
+                    # fails just like the condition would
+                    if not self.binary(stmt.condition, value, current):
+                        break
+                elif not compare(value, current):
+                    break
+
+                self.ticks -= 1
+                if self.ticks <= 0:
+                    self.check_limits(stmt.token)
+                self.evaluate(body)
+
+                value += step
+                values[name] = value
+        except BreakException as exc:
+            pass
+
+        return True
+
+    def visit_for_in_stmt(self, stmt: ForInStmt):
+        iterator = self.iterate(stmt, self.evaluate(stmt.iterable))
+        body = (stmt.body,)
+        try:
+            for value in iterator:
+                self.ticks -= 1
+                if self.ticks <= 0:
+                    self.check_limits(stmt.token)
+                self.execute_frame(body, self.loop_scope(stmt, value))
+        except BreakException as exc:
+            pass
+        except NativeException as exc:
+            raise RuntimeException(stmt.token, str(exc))
+        except RecursionError:
+            raise self.too_deep(stmt.token)
+
+    def iterate(self, stmt: ForInStmt, iterable):
+        """
+        Python iterator over the values a for-in loop visits.
+        """
+        _type = type(iterable)
+        if _type is LoxGenerator:
+            return iterable
+        if _type is LoxArray:
+            return iter(iterable.elements)
+        if _type is LoxMap:
+            return iter(iterable.keys())
+        if _type is str or _type is Rope:
+            return iter(str(iterable))
+
+        raise RuntimeException(
+            stmt.token, "Only generators, arrays, maps and strings are iterable."
+        )
+
+    def loop_scope(self, stmt: ForInStmt, value) -> Environment:
+        if stmt.name in self.cells:
+            value = Cell(value)
+        env = self.take_frame(self.env)
+        env.put(stmt.name.lexeme, value)
+        return env
+
+    def visit_yield_stmt(self, stmt: YieldStmt):
+        # generator bodies are run by their own runner
+        raise RuntimeException(stmt.token, "Can't yield outside of a generator.")
+
     def visit_break_stmt(self, stmt: BreakStmt):
         raise BreakException()
 
     def visit_fun_decl(self, stmt: FunDeclStmt):
-        fun = LoxFunction(stmt.declaration, self.env, stmt.name.lexeme)
-        self.env.put(stmt.name.lexeme, fun)
+        self.define(stmt.name, None)
+        fun = LoxFunction(
+            stmt.declaration, self.capture(stmt.declaration), stmt.name.lexeme
+        )
+        self.env.assign_at(0, stmt.name.lexeme, fun)
 
     def visit_class_decl(self, stmt: ClassDeclStmt):
-        methods: dict[str, LoxFunction] = {}
-
         superclass = None
         if stmt.superclass is not None:
             superclass = self.evaluate(stmt.superclass)
-            if not isinstance(superclass, LoxClass):
-                raise ReferenceException(
-                    stmt.superclass.name, "Superclass must be a class"
-                )
+
+        self.declare_class(stmt, superclass)
+
+    def declare_class(self, stmt: ClassDeclStmt, superclass):
+        if stmt.superclass is not None and not isinstance(superclass, LoxClass):
+            raise ReferenceException(
+                stmt.superclass.name, "Superclass must be a class"
+            )
+
+        methods: dict[str, LoxFunction] = {}
+
+        self.define(stmt.name, None)
 
         for method in stmt.methods:
             methods[method.name.lexeme] = LoxFunction(
-                method.declaration, self.env
+                method.declaration, self.capture(method.declaration)
             )
 
         klass = LoxClass(stmt.name, superclass, methods)
-        self.env.put(stmt.name.lexeme, klass)
+        self.env.assign_at(0, stmt.name.lexeme, klass)
 
     def visit_return_stmt(self, stmt: ReturnStmt):
         raise Return(
             self.evaluate(stmt.value) if stmt.value is not None else None
         )
 
+    def visit_import_stmt(self, stmt: ImportStmt):
+        module = self.load_import(stmt)
+        if module is None:
+            return
+
+        env = self.begin_import(module)
+        try:
+            self.execute_block(module.statements, env)
+        finally:
+            self.end_import()
+
+        self.export_import(module, env)
+
+    def load_import(self, stmt: ImportStmt):
+        """
+        Module imported by stmt, None when it is already imported.
+        """
+        from src.lox.modules import load_module
+        from src.lox.program import CompileError
+
+        if self.importing:
+            base_dir = os.path.dirname(self.importing[-1])
+        else:
+            base_dir = self.base_dir or os.getcwd()
+        path = os.path.abspath(os.path.join(base_dir, stmt.path))
+
+        if path in self.importing:
+            raise RuntimeException(stmt.token, f"Circular import of '{stmt.path}'.")
+        if path in self.imported:
+            return None
+
+        try:
+            module = load_module(path)
+        except (OSError, UnicodeDecodeError):
+            raise RuntimeException(stmt.token, f"Can't read module '{stmt.path}'.")
+        except CompileError as error:
+            raise RuntimeException(
+                stmt.token, f"Module '{stmt.path}' has errors: {error}"
+            )
+
+        # module nodes are resolved separately
+        self.bindings, self.captures, self.cells = module.merge(
+            self.bindings, self.captures, self.cells
+        )
+
+        return module
+
+    def begin_import(self, module) -> Environment:
+        # module globals sit on top of the program's, its functions close
+        # over them while the names are exported to the importer
+        env = Environment(self.env_global)
+        self.previous_globals.append(self.env_global)
+        self.env_global = env
+        self.importing.append(module.path)
+        return env
+
+    def end_import(self):
+        self.importing.pop()
+        self.env_global = self.previous_globals.pop()
+
+    def export_import(self, module, env: Environment):
+        # the importer gets the module's cells, so assignments made by the
+        # module's functions and by the importer reach the same variable
+        self.imported.add(module.path)
+        target = self.env_global
+        shadows = target.parent is not None
+        for name in list(env.env):
+            shadows = shadows or name in target.env
+            target.put(name, env.slot(name))
+        if shadows:
+            self.global_slots.clear()
+
     ## ----------- statements end -------------------
 
     ## ----------- expressions start ----------------
@@ -143,8 +594,20 @@ class Interpreter(ExprVisitor, StmtVisitor):
         distance = self.bindings.get(expr)
         if distance is not None:
             return self.env.get_at(distance, var.lexeme)
-        else:
-            return self.env.get(var.lexeme)
+
+        slot = self.global_slots.get(expr)
+        if slot is None:
+            slot = self.global_slot(expr, var)
+        return slot.value
+
+    def global_slot(self, expr: Expr, var: Token) -> Cell:
+        """
+        Cell of the global var refers to, cached for expr. Unresolved sites
+        always reach the same global, until it is shadowed by a new one.
+        """
+        slot = self.env.slot(var.lexeme)
+        self.global_slots[expr] = slot
+        return slot
 
     def visit_variable(self, expr: Variable):
         try:
@@ -156,15 +619,21 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return self.look_var(expr, expr.token)
 
     def visit_assignment(self, expr: Assignment):
+        return self.assign(expr, self.evaluate(expr.value))
+
+    def assign(self, expr: Assignment, value):
         try:
-            distance = self.bindings.get(expr.name.lexeme)
-            value = self.evaluate(expr.value)
+            distance = self.bindings.get(expr)
             if distance is not None:
                 self.env.assign_at(distance, expr.name.lexeme, value)
-            else:
-                self.env.assign(expr.name.lexeme, value)
+                return value
+
+            slot = self.global_slots.get(expr)
+            if slot is None:
+                slot = self.global_slot(expr, expr.name)
+            slot.value = value
             return value
-        except Exception as excp:
+        except ValueError as excp:
             raise ReferenceException(
                 expr.name, "Cannot assign to undefined Variable."
             )
@@ -172,6 +641,74 @@ class Interpreter(ExprVisitor, StmtVisitor):
     def visit_call(self, expr: Call) -> Any:
         callee = self.evaluate(expr.callee)
 
+        self.ticks -= 1
+        if self.ticks <= 0:
+            self.check_limits(expr.token)
+
+        inline = expr.inline
+        if (
+            inline is not None
+            and type(callee) is LoxFunction
+            and callee.funStmt is inline
+        ):
+            return self.call_inline(expr, callee)
+
+        if type(callee) is ForeignFunction:
+            if len(expr.arguments) != callee.argc:
+                raise RuntimeException(
+                    expr.token,
+                    f"Expected {callee.argc} arguments, but got {len(expr.arguments)}",
+                )
+            try:
+                return callee.call_direct(self, expr.arguments)
+            except NativeException as exc:
+                raise RuntimeException(expr.token, str(exc))
+
+        self.check_callable(expr, callee)
+
+        args = [self.evaluate(arg) for arg in expr.arguments]
+
+        self.check_depth(expr)
+
+        self.depth += 1
+        try:
+            return callee.call(self, args)
+        except NativeException as exc:
+            raise RuntimeException(expr.token, str(exc))
+        except RecursionError:
+            raise self.too_deep(expr.token)
+        finally:
+            self.depth -= 1
+
+    def call_inline(self, expr: Call, function: LoxFunction):
+        """
+        Evaluate the returned expression of the function inlined at expr,
+        its parameters bound in a pooled frame, without a full call.
+        """
+        args = [self.evaluate(arg) for arg in expr.arguments]
+
+        self.check_depth(expr)
+
+        env = self.take_frame(function.closure)
+        values = env.env
+        for param, value in zip(expr.inline.params, args):
+            values[param.lexeme] = value
+
+        previous = self.env
+        self.env = env
+        self.depth += 1
+        try:
+            return self.evaluate(expr.inline.body[0].value)
+        except NativeException as exc:
+            raise RuntimeException(expr.token, str(exc))
+        except RecursionError:
+            raise self.too_deep(expr.token)
+        finally:
+            self.depth -= 1
+            self.env = previous
+            self.release_frame(env)
+
+    def check_callable(self, expr: Call, callee):
         if not isinstance(callee, Callable):
             raise RuntimeException(
                 expr.token, "Only functions and classes are callable."
@@ -183,26 +720,88 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 f"Expected {callee.arity} arguments, but got {len(expr.arguments)}",
             )
 
-        args = map(self.evaluate, expr.arguments)
-        return callee.call(self, list(args))
+    def check_depth(self, expr: Call):
+        if self.depth >= self.max_depth:
+            raise LimitExceededException(
+                expr.token, "depth", f"Exceeded call depth of {self.max_depth}."
+            )
+
+    @staticmethod
+    def too_deep(token: Token) -> LimitExceededException:
+        # code nesting deeper than FRAMES_PER_CALL between calls, or
+        # generators resuming each other, reach python's limit first
+        return LimitExceededException(
+            token, "depth", "Exceeded python's recursion limit."
+        )
 
     def visit_anonymous_fn(self, expr: AnonymousFnExpr):
-        return LoxFunction(expr, self.env)
+        return LoxFunction(expr, self.capture(expr))
 
     def visit_literal(self, expr: Literal):
         return expr.value
 
     def visit_grouping(self, expr: Grouping):
-        return self.evaluate(expr.expr)
+        return self.evaluate(self.ungroup(expr))
+
+    @staticmethod
+    def ungroup(expr: Grouping) -> Expr:
+        # nested parentheses are unwrapped in a loop
+        expr = expr.expr
+        while type(expr) is Grouping:
+            expr = expr.expr
+        return expr
 
     def visit_binary(self, expr: Binary):
-        left_operand = self.evaluate(expr.left)
-        right_operand = self.evaluate(expr.right)
+        left = expr.left
+        if type(left) is Binary:
+            # two operators are evaluated directly, longer chains in a loop
+            inner = left.left
+            if type(inner) is Binary or type(inner) is Logical:
+                return self.evaluate_chain(expr)
+            left_operand = self.binary(
+                left, self.evaluate(inner), self.evaluate(left.right)
+            )
+        elif type(left) is Logical:
+            return self.evaluate_chain(expr)
+        else:
+            left_operand = self.evaluate(left)
+
+        return self.binary(expr, left_operand, self.evaluate(expr.right))
+
+    def evaluate_chain(self, expr: Binary | Logical):
+        chain = self.operator_chain(expr)
+        value = self.evaluate(chain[-1].left)
+        for node in reversed(chain):
+            if type(node) is Binary:
+                value = self.binary(node, value, self.evaluate(node.right))
+            elif not self.short_circuits(node, value):
+                value = self.evaluate(node.right)
+        return value
+
+    @staticmethod
+    def operator_chain(expr: Binary | Logical) -> list[Binary | Logical]:
+        """
+        Binary and logical expressions nested to the left of expr, expr
+        first. Chains nest as deep as they are long, so they are evaluated
+        in a loop from the innermost left operand out.
+        """
+        chain = []
+        while type(expr) is Binary or type(expr) is Logical:
+            chain.append(expr)
+            expr = expr.left
+        return chain
 
+    @staticmethod
+    def short_circuits(expr: Logical, left_result) -> bool:
+        if expr.operator.type == TokenType.OR:
+            return bool(left_result)
+        return not left_result
+
+    def binary(self, expr: Binary, left_operand, right_operand):
         match expr.operator.type:
             case TokenType.PLUS:
-                if self.all_type(str, left_operand, right_operand):
-                    return left_operand + right_operand
+                if is_string(left_operand) and is_string(right_operand):
+                    return concat(left_operand, right_operand)
 
                 if self.all_type(float, left_operand, right_operand):
                     return left_operand + right_operand
@@ -255,7 +854,11 @@ class Interpreter(ExprVisitor, StmtVisitor):
                 return left_operand != right_operand
 
     def visit_logical(self, expr: Logical):
-        left_result = self.evaluate(expr.left)
+        left = expr.left
+        if type(left) is Binary or type(left) is Logical:
+            return self.evaluate_chain(expr)
+
+        left_result = self.evaluate(left)
 
         if expr.operator.type == TokenType.OR:
             if left_result:
@@ -267,14 +870,19 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return self.evaluate(expr.right)
 
     def visit_unary(self, expr: Unary):
+        return self.unary(expr, self.evaluate(expr.right))
+
+    def unary(self, expr: Unary, operand):
         match expr.operator.type:
             case TokenType.MINUS:
-                return -(self.evaluate(expr.right))
+                return -operand
             case TokenType.BANG:
-                return not self.evaluate(expr.right)
+                return not operand
 
     def visit_get_expr(self, expr: GetExpr):
-        object = self.evaluate(expr.object)
+        return self.get_property(expr, self.evaluate(expr.object))
+
+    def get_property(self, expr: GetExpr, object):
         if isinstance(object, LoxInstance):
             property_name = expr.property_name.lexeme
             try:
@@ -290,24 +898,70 @@ class Interpreter(ExprVisitor, StmtVisitor):
 
     def visit_set_expr(self, expr: SetExpr):
         object = self.evaluate(expr.object)
+        self.check_instance(expr, object)
 
-        if isinstance(object, LoxInstance):
-            value = self.evaluate(expr.value)
-            object.set(expr.property_name.lexeme, value)
-            return value
+        value = self.evaluate(expr.value)
+        object.set(expr.property_name.lexeme, value)
+        return value
 
-        raise RuntimeException(
-            expr.property_name, "Only instances have fields."
-        )
+    def check_instance(self, expr: SetExpr, object):
+        if not isinstance(object, LoxInstance):
+            raise RuntimeException(
+                expr.property_name, "Only instances have fields."
+            )
+
+    def visit_array_expr(self, expr: ArrayExpr):
+        return LoxArray([self.evaluate(element) for element in expr.elements])
+
+    def visit_index_expr(self, expr: IndexExpr):
+        container = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        self.check_container(expr, container)
+
+        return self.get_index(expr, container, index)
+
+    def visit_index_set_expr(self, expr: IndexSetExpr):
+        container = self.evaluate(expr.object)
+        index = self.evaluate(expr.index)
+        self.check_container(expr, container)
+
+        return self.set_index(expr, container, index, self.evaluate(expr.value))
+
+    def check_container(self, expr: IndexExpr | IndexSetExpr, container):
+        if type(container) is not LoxArray and type(container) is not LoxMap:
+            raise RuntimeException(
+                expr.token, "Only arrays and maps can be indexed."
+            )
+
+    def set_index(self, expr: IndexSetExpr, container, index, value):
+        try:
+            container.set(index, value)
+        except NativeException as exc:
+            raise RuntimeException(expr.token, str(exc))
+        return value
+
+    def get_index(self, expr: IndexExpr, container, index):
+        try:
+            return container.get(index)
+        except NativeException as exc:
+            raise RuntimeException(expr.token, str(exc))
 
     ## ----------- expressions end ----------------
 
     def interpret(self, stmts: list[Stmt]):
+        self.start_limits()
         try:
             for stmt in stmts:
                 self.evaluate(stmt)
         except RuntimeException as exp:
             self.errors = [exp]
+        except RecursionError as exp:
+            # nested too deep outside of any call, like printing a deeply
+            # nested array
+            self.errors = [exp]
+        finally:
+            self.end_limits()
+            self.output.flush()
 
     def reset_errors(self):
         self.errors = []
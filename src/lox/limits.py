@@ -0,0 +1,35 @@
+# nested Lox calls allowed when no depth limit is given
+DEFAULT_MAX_DEPTH = 512
+
+
+class Limits:
+    """
+    Execution limits for an interpreter run, None disables a limit.
+
+    max_steps: loop iterations plus function calls.
+    timeout: wall clock seconds.
+    max_depth: nested Lox calls, DEFAULT_MAX_DEPTH unless given. Python's
+        process wide recursion limit is raised to allow it while the run
+        lasts, and restored afterwards.
+    max_heap_blocks: growth of python's allocated memory blocks, an
+        approximation of heap growth.
+
+    Everything except depth is checked every check_interval steps.
+    """
+
+    def __init__(
+        self,
+        max_steps: int | None = None,
+        timeout: float | None = None,
+        max_depth: int | None = DEFAULT_MAX_DEPTH,
+        max_heap_blocks: int | None = None,
+        check_interval: int = 1000,
+    ) -> None:
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.max_heap_blocks = max_heap_blocks
+        self.check_interval = check_interval
+
+
+__all__ = ["DEFAULT_MAX_DEPTH", "Limits"]
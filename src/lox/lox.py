@@ -1,79 +1,163 @@
+from __future__ import annotations
+import os
 import sys
 
 from src.lox.ast_printer import print_errors
 from src.lox.interpreter import Interpreter
-from src.lox.parser import Parser
-from src.lox.resolver import Resolver
-from src.lox.scanner import Scanner
+from src.lox.output import FileOutput, Output, StdoutOutput
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from src.lox.program import Program
+    from src.lox.repl import Session
 
 
 class Lox:
-    def __init__(self):
+    def __init__(self, output: Output | None = None):
         self.had_errors = False
         self.had_runtime_errors = False
-        self.resolver = Resolver()
         self.interpreter = Interpreter()
+        # resolution tables of an interactive session, None for scripts
+        self.session: Session | None = None
 
-    def run(self, code: str):
-        self.interpreter.reset_errors()
+        if output is not None:
+            self.interpreter.set_output(output)
 
-        scanner = Scanner(code)
-        tokens = scanner.scan_tokens()
-
-        if len(scanner.errors) > 0:
-            print_errors(scanner.errors)
-            self.had_errors = True
-            return
-
-        parser = Parser(tokens)
-        stmts = parser.parse()
-
-        if len(parser.errors) > 0:
-            self.had_errors = True
-            print_errors(parser.errors)
-            return
+    def run(self, code: str):
+        from src.lox.program import CompileError, front_end
 
-        self.resolver.resolve_stmts(stmts)
+        self.interpreter.reset_errors()
 
-        if len(self.resolver.errors) > 0:
+        try:
+            stmts, resolver = front_end(code)
+        except CompileError as error:
             self.had_errors = True
-            print_errors(self.resolver.errors)
+            print_errors(error.errors)
             return
 
-        self.interpreter.set_bindings(self.resolver.bindings)
-        self.interpreter.interpret(stmts)
+        if self.session is None:
+            self.interpreter.set_bindings(resolver.bindings)
+            self.interpreter.set_captures(resolver.captures, resolver.cells)
+            self.interpreter.interpret(stmts)
+        else:
+            unit = self.session.add(resolver)
+            self.interpreter.interpret(stmts)
+            unit.release()
 
         if self.interpreter.has_error:
             print_errors(self.interpreter.errors)
             self.had_runtime_errors = True
             return
 
+    @staticmethod
+    def compile(code: str) -> Program:
+        """
+        Scan, parse and resolve code once, raises CompileError on failure.
+        """
+        from src.lox.program import compile_source
+
+        return compile_source(code)
+
     def run_file(self, file: str):
         with open(file, "r", encoding="utf-8") as _file:
+            self.interpreter.base_dir = os.path.dirname(os.path.abspath(file))
             self.run(_file.read())
+            self.interpreter.output.close()
             if self.had_errors:
                 sys.exit(65)
             if self.had_runtime_errors:
                 sys.exit(70)
 
     def start_repl(self):
+        from src.lox.repl import Session, is_complete
+
+        self.session = Session(self.interpreter)
+        lines = []
+
         while True:
-            line = input("> ")
-            if line is None:
+            try:
+                line = input("... " if lines else "> ")
+            except EOFError:
+                print()
                 break
-            self.run(line)
+            except KeyboardInterrupt:
+                print()
+                lines = []
+                continue
+
+            lines.append(line)
+            code = "\n".join(lines)
+
+            # a blank line runs what was entered even if it is incomplete
+            if line.strip() and not is_complete(code):
+                continue
+
+            lines = []
+            self.run(code)
+
+
+USAGE = """Usage: plox [--line-buffered] [--output file] [script]
+       plox --serve [--socket path] [--workers n] [--timeout seconds]
+                    [--max-steps n] [--max-depth n]
+       plox --client [--socket path] script [args...]
+       plox run-many [--jobs n] [--timeout seconds] [--max-steps n]
+                     [--max-depth n] [--json] paths...
+       plox check [--jobs n] paths..."""
 
 
 def main(args: list[str]):
-    arg_size = len(args)
+    if args and args[0] == "--serve":
+        from src.lox import server
+
+        return server.main(args[1:])
+
+    if args and args[0] == "run-many":
+        from src.lox import batch
+
+        return batch.main(args[1:])
+
+    if args and args[0] == "check":
+        from src.lox import check
+
+        return check.main(args[1:])
 
-    lox = Lox()
+    if args and args[0] == "--client":
+        from src.lox import client
 
-    if arg_size > 1:
-        print("Usage: plox [script]")
+        return client.main(args[1:])
+
+    line_buffered = False
+    output_file = None
+    scripts = []
+
+    args = iter(args)
+    for arg in args:
+        if arg == "--line-buffered":
+            line_buffered = True
+        elif arg == "--output":
+            output_file = next(args, None)
+            if output_file is None:
+                print(USAGE)
+                sys.exit(64)
+        else:
+            scripts.append(arg)
+
+    if len(scripts) > 1:
+        print(USAGE)
         sys.exit(64)
-    elif arg_size == 1:
-        lox.run_file(args[0])
+
+    # interactive sessions want every line as soon as it is printed
+    line_buffered = line_buffered or len(scripts) == 0
+
+    if output_file is not None:
+        output = FileOutput(output_file, line_buffered=line_buffered)
+    else:
+        output = StdoutOutput(line_buffered=line_buffered)
+
+    lox = Lox(output)
+
+    if len(scripts) == 1:
+        lox.run_file(scripts[0])
     else:
         lox.start_repl()
 
@@ -0,0 +1,302 @@
+"""
+Memoization of pure functions, opted into per function.
+
+    fun fib(n) {
+      if (n <= 1) return n;
+      return fib(n - 2) + fib(n - 1);
+    }
+    fib = memoize(fib, 1000);
+
+A function is pure when it never prints, sets properties or indexes,
+assigns or reads variables of enclosing functions, assigns globals or
+yields, and every global it refers to is a pure function or native when
+memoize is called. Results are cached per argument list in a bounded LRU,
+calls with arrays, maps, instances or functions as arguments are passed
+through uncached.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+
+from src.lox.callable import Callable, LoxFunction
+from src.lox.expr import ExprVisitor, Variable
+from src.lox.hashmap import BOOL_KEYS
+from src.lox.rope import Rope
+from src.lox.stmt import StmtVisitor
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+    from src.lox.expr import (
+        AnonymousFnExpr,
+        ArrayExpr,
+        Assignment,
+        Binary,
+        Call,
+        Expr,
+        GetExpr,
+        Grouping,
+        IndexExpr,
+        Literal,
+        Unary,
+    )
+    from src.lox.interpreter import Interpreter
+    from src.lox.stmt import (
+        BlockStmt,
+        BreakStmt,
+        ClassDeclStmt,
+        ExprStmt,
+        ForInStmt,
+        FunDeclStmt,
+        IfStmt,
+        ReturnStmt,
+        Stmt,
+        VarDeclStmt,
+        WhileStmt,
+    )
+
+# marks a cache miss, nil is a valid result
+NOTHING = object()
+
+
+class PurityChecker(StmtVisitor, ExprVisitor):
+    """
+    Finds effects in a function body, along with the globals it refers to.
+    Nested function bodies are skipped, calling them needs a local callee,
+    which already makes the body impure.
+    """
+
+    def __init__(self, bindings: dict) -> None:
+        self.bindings = bindings
+        self.pure = True
+        self.globals: set[str] = set()
+
+    def check(self, statements: list[Stmt]) -> bool:
+        for statement in statements:
+            statement.accept(self)
+        return self.pure
+
+    def check_all(self, nodes: list[Stmt | Expr]):
+        for node in nodes:
+            node.accept(self)
+
+    def impure(self, *_):
+        self.pure = False
+
+    ## ----------- statements start ----------------
+    def visit_expr_stmt(self, stmt: ExprStmt):
+        stmt.expr.accept(self)
+
+    visit_print_stmt = impure
+
+    def visit_var_decl_stmt(self, stmt: VarDeclStmt):
+        if stmt.expr is not None:
+            stmt.expr.accept(self)
+
+    def visit_block_stmt(self, stmt: BlockStmt):
+        self.check_all(stmt.statements)
+
+    def visit_if_stmt(self, stmt: IfStmt):
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    def visit_while_stmt(self, stmt: WhileStmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visit_for_in_stmt(self, stmt: ForInStmt):
+        stmt.iterable.accept(self)
+        stmt.body.accept(self)
+
+    def visit_break_stmt(self, stmt: BreakStmt):
+        pass
+
+    def visit_fun_decl(self, stmt: FunDeclStmt):
+        pass
+
+    def visit_return_stmt(self, stmt: ReturnStmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+
+    def visit_class_decl(self, stmt: ClassDeclStmt):
+        if stmt.superclass is not None:
+            stmt.superclass.accept(self)
+
+    visit_import_stmt = impure
+    visit_yield_stmt = impure
+
+    ## ----------- statements end -------------------
+
+    ## ----------- expressions start ----------------
+    def visit_variable(self, expr: Variable):
+        if expr not in self.bindings:
+            self.globals.add(expr.name.lexeme)
+
+    def visit_assignment(self, expr: Assignment):
+        if expr not in self.bindings:
+            self.pure = False
+        expr.value.accept(self)
+
+    def visit_call(self, expr: Call):
+        # only globals are known to be functions checked for purity
+        if type(expr.callee) is not Variable or expr.callee in self.bindings:
+            self.pure = False
+        expr.callee.accept(self)
+        self.check_all(expr.arguments)
+
+    def visit_anonymous_fn(self, expr: AnonymousFnExpr):
+        pass
+
+    def visit_literal(self, expr: Literal):
+        pass
+
+    def visit_grouping(self, expr: Grouping):
+        expr.expr.accept(self)
+
+    def visit_binary(self, expr: Binary):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    visit_logical = visit_binary
+
+    def visit_unary(self, expr: Unary):
+        expr.right.accept(self)
+
+    def visit_get_expr(self, expr: GetExpr):
+        expr.object.accept(self)
+
+    visit_set_expr = impure
+    visit_this_expr = impure
+
+    def visit_array_expr(self, expr: ArrayExpr):
+        self.check_all(expr.elements)
+
+    def visit_index_expr(self, expr: IndexExpr):
+        expr.object.accept(self)
+        expr.index.accept(self)
+
+    visit_index_set_expr = impure
+
+    ## ----------- expressions end ----------------
+
+
+def is_pure(interpreter: Interpreter, value, seen: set | None = None) -> bool:
+    """
+    Whether calling value has no effects and depends only on its arguments.
+    Functions being checked further up count as pure, for recursion.
+    """
+    if type(value) is not LoxFunction:
+        return getattr(value, "pure", False)
+
+    fun = value.funStmt
+    if seen is None:
+        seen = set()
+    if fun in seen:
+        return True
+    if fun.is_generator or interpreter.captures.get(fun):
+        return False
+    seen.add(fun)
+
+    checker = PurityChecker(interpreter.bindings)
+    if not checker.check(fun.body):
+        return False
+
+    for name in checker.globals:
+        try:
+            target = value.closure.get(name)
+        except ValueError:
+            return False
+        if not is_pure(interpreter, target, seen):
+            return False
+
+    return True
+
+
+def cache_key(args: list[Any]) -> tuple | None:
+    """
+    Key for args, None when an argument is not a plain value.
+    """
+    key = []
+    for arg in args:
+        _type = type(arg)
+        if _type is bool:
+            arg = BOOL_KEYS[arg]
+        elif _type is Rope:
+            arg = str(arg)
+        elif _type is not float and _type is not str and arg is not None:
+            return None
+        key.append(arg)
+    return tuple(key)
+
+
+class Memoized(Callable):
+    """
+    Pure function whose results are kept for the size most recently used
+    argument lists.
+    """
+
+    pure = True
+
+    def __init__(self, function: LoxFunction, size: int) -> None:
+        self.function = function
+        self.size = size
+        self.cache: OrderedDict[tuple, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, interpreter: Interpreter, args: list[Any]) -> Any:
+        key = cache_key(args)
+        if key is None:
+            return self.function.call(interpreter, args)
+
+        value = self.lookup(key)
+        if value is NOTHING:
+            value = self.function.call(interpreter, args)
+            self.store(key, value)
+        return value
+
+    async def call_async(self, interpreter: Interpreter, args: list[Any]) -> Any:
+        key = cache_key(args)
+        if key is None:
+            return await interpreter.call(self.function, args)
+
+        value = self.lookup(key)
+        if value is NOTHING:
+            value = await interpreter.call(self.function, args)
+            self.store(key, value)
+        return value
+
+    def lookup(self, key: tuple) -> Any:
+        cache = self.cache
+        value = cache.get(key, NOTHING)
+        if value is NOTHING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            cache.move_to_end(key)
+        return value
+
+    def store(self, key: tuple, value):
+        _type = type(value)
+        if _type is Rope:
+            value = str(value)
+        elif _type not in (float, str, bool) and value is not None:
+            # arrays, maps and instances are new objects on every call
+            return
+
+        cache = self.cache
+        cache[key] = value
+        if len(cache) > self.size:
+            cache.popitem(last=False)
+
+    @property
+    def arity(self) -> int:
+        return self.function.arity
+
+    def __str__(self) -> str:
+        return str(self.function)
+
+
+__all__ = ["Memoized", "cache_key", "is_pure"]
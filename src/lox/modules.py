@@ -0,0 +1,98 @@
+"""
+Modules loaded by `import "path";`. Compiled modules are cached for the
+lifetime of the process, keyed by resolved path and invalidated when the
+file's mtime changes.
+"""
+
+import os
+import threading
+from types import MappingProxyType
+
+from src.lox.program import front_end
+from src.lox.stmt import Stmt
+
+
+# most importer tables a module keeps its merged tables for
+MERGED_SIZE = 32
+
+
+class Module:
+    __slots__ = ("path", "statements", "bindings", "captures", "cells", "merged")
+
+    def __init__(self, path: str, statements: list[Stmt], resolver) -> None:
+        self.path = path
+        self.statements = tuple(statements)
+        self.bindings = resolver.bindings
+        self.captures = resolver.captures
+        self.cells = frozenset(resolver.cells)
+        # id of importer bindings -> (importer bindings, merged tables)
+        self.merged: dict[int, tuple] = {}
+
+    def merge(self, bindings, captures, cells) -> tuple:
+        """
+        An importer's resolution tables extended with the module's. Read
+        only tables, shared by every run of a program, are merged once and
+        reused by later runs, an interpreter's own tables are extended in
+        place.
+        """
+        if type(bindings) is not MappingProxyType:
+            bindings.update(self.bindings)
+            captures.update(self.captures)
+            cells.update(self.cells)
+            return bindings, captures, cells
+
+        key = id(bindings)
+        with lock:
+            cached = self.merged.get(key)
+        # the importer's tables are kept alive with the entry, so a matching
+        # id is the same tables
+        if cached is not None and cached[0] is bindings:
+            return cached[1]
+
+        tables = (
+            MappingProxyType({**bindings, **self.bindings}),
+            MappingProxyType({**captures, **self.captures}),
+            cells | self.cells,
+        )
+        # runs of a program on other threads may merge at the same time
+        with lock:
+            if len(self.merged) >= MERGED_SIZE:
+                self.merged.pop(next(iter(self.merged)))
+            self.merged[key] = (bindings, tables)
+        return tables
+
+
+# path -> (mtime, module)
+modules: dict[str, tuple[int, Module]] = {}
+# held while compiling, so threads importing a module compile it once,
+# and while changing a module's merged tables
+lock = threading.Lock()
+
+
+def load_module(path: str) -> Module:
+    """
+    Compiled module at absolute path. Raises OSError when the file can't be
+    read, UnicodeDecodeError when it isn't UTF-8 and CompileError when it
+    has errors.
+    """
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = modules.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with lock:
+        cached = modules.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, "r", encoding="utf-8") as file:
+            source = file.read()
+
+        module = Module(path, *front_end(source))
+        modules[path] = (mtime, module)
+
+    return module
+
+
+__all__ = ["Module", "load_module"]
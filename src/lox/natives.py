@@ -1,15 +1,26 @@
+from __future__ import annotations
 import time
-from typing import Any
+from types import MappingProxyType
+from src.lox.array import LoxArray
 from src.lox.callable import Callable
 from src.lox.env import Environment
+from src.lox.exceptions import NativeException
+from src.lox.generator import LoxGenerator
+from src.lox.hashmap import LoxMap
+from src.lox.rope import is_string
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
 
-class Clock(Callable):
-    def __init__(self) -> None:
-        self.__arity = 0
 
-    def call(self, interpreter, args: list[Any]) -> Any:
-        return time.time()
+class Native(Callable):
+    # whether calls depend only on the arguments and change nothing,
+    # natives that are may be called by memoized functions
+    pure = False
+
+    def __init__(self, arity: int) -> None:
+        self.__arity = arity
 
     @property
     def arity(self):
@@ -19,8 +30,295 @@ class Clock(Callable):
         return "<native fn>"
 
 
+class Clock(Native):
+    def __init__(self) -> None:
+        super().__init__(0)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return time.time()
+
+
+def expect_array(value) -> LoxArray:
+    if type(value) is not LoxArray:
+        raise NativeException("Expected an array.")
+    return value
+
+
+def expect_map(value) -> LoxMap:
+    if type(value) is not LoxMap:
+        raise NativeException("Expected a map.")
+    return value
+
+
+def expect_generator(value) -> LoxGenerator:
+    if type(value) is not LoxGenerator:
+        raise NativeException("Expected a generator.")
+    return value
+
+
+def expect_integer(value) -> int:
+    if type(value) is not float or not value.is_integer():
+        raise NativeException("Expected an integer.")
+    return int(value)
+
+
+class Length(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        if type(args[0]) is LoxMap:
+            return float(len(args[0].entries))
+        if is_string(args[0]):
+            return float(len(args[0]))
+        return float(len(expect_array(args[0]).elements))
+
+
+class Push(Native):
+    def __init__(self) -> None:
+        super().__init__(2)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        elements = expect_array(args[0]).elements
+        elements.append(args[1])
+        return float(len(elements))
+
+
+class Pop(Native):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        elements = expect_array(args[0]).elements
+        if not elements:
+            raise NativeException("Can't pop from an empty array.")
+        return elements.pop()
+
+
+class Slice(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(3)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        elements = expect_array(args[0]).elements
+        start = expect_integer(args[1])
+        end = expect_integer(args[2])
+        return LoxArray(elements[start:end])
+
+
+class NewMap(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(0)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return LoxMap()
+
+
+class MapGet(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(2)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return expect_map(args[0]).get(args[1])
+
+
+class MapSet(Native):
+    def __init__(self) -> None:
+        super().__init__(3)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        expect_map(args[0]).set(args[1], args[2])
+        return args[2]
+
+
+class MapHas(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(2)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return expect_map(args[0]).has(args[1])
+
+
+class MapDelete(Native):
+    def __init__(self) -> None:
+        super().__init__(2)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return expect_map(args[0]).delete(args[1])
+
+
+class MapKeys(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return LoxArray(expect_map(args[0]).keys())
+
+
+class MapValues(Native):
+    pure = True
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return LoxArray(expect_map(args[0]).values())
+
+
+class Next(Native):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return expect_generator(args[0]).next()
+
+
+class Done(Native):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        return expect_generator(args[0]).done()
+
+
+class Memoize(Native):
+    def __init__(self) -> None:
+        super().__init__(2)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        from src.lox.callable import LoxFunction
+        from src.lox.memo import Memoized, is_pure
+
+        function = args[0]
+        if type(function) is not LoxFunction:
+            raise NativeException("Expected a function.")
+        size = expect_integer(args[1])
+        if size <= 0:
+            raise NativeException("Cache size must be positive.")
+        if not is_pure(interpreter, function):
+            raise NativeException("Only pure functions can be memoized.")
+
+        return Memoized(function, size)
+
+
+class MemoStats(Native):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        from src.lox.memo import Memoized
+
+        memoized = args[0]
+        if type(memoized) is not Memoized:
+            raise NativeException("Expected a memoized function.")
+
+        stats = LoxMap()
+        stats.set("hits", float(memoized.hits))
+        stats.set("misses", float(memoized.misses))
+        stats.set("size", float(len(memoized.cache)))
+        return stats
+
+
+# name and arity of natives implemented in stdlib.py
+STDLIB = {
+    "sqrt": 1,
+    "floor": 1,
+    "ceil": 1,
+    "abs": 1,
+    "round": 1,
+    "pow": 2,
+    "min": 2,
+    "max": 2,
+    "sin": 1,
+    "cos": 1,
+    "exp": 1,
+    "log": 1,
+    "substring": 3,
+    "charAt": 2,
+    "charCode": 2,
+    "fromCharCode": 1,
+    "indexOf": 2,
+    "upper": 1,
+    "lower": 1,
+    "toNumber": 1,
+    "toString": 1,
+    "toFixed": 2,
+}
+
+
+class StdlibNative(Native):
+    """
+    Native from stdlib.py. The module is imported, and the function looked
+    up, on first call so unused natives cost nothing at startup.
+    """
+
+    pure = True
+
+    def __init__(self, name: str, arity: int) -> None:
+        super().__init__(arity)
+        self.name = name
+        self.function = None
+
+    def call(self, interpreter, args: list[Any]) -> Any:
+        if self.function is None:
+            from src.lox.stdlib import FUNCTIONS
+
+            self.function = FUNCTIONS[self.name]
+
+        try:
+            return self.function(*args)
+        except (ValueError, OverflowError) as exc:
+            raise NativeException(f"{self.name}: {exc}")
+
+
+# built on first use, natives are stateless so every interpreter shares them
+NATIVES: MappingProxyType | None = None
+
+
+def native_table() -> MappingProxyType:
+    global NATIVES
+
+    if NATIVES is None:
+        natives = {
+            "clock": Clock(),
+            "len": Length(),
+            "push": Push(),
+            "pop": Pop(),
+            "slice": Slice(),
+            "map": NewMap(),
+            "get": MapGet(),
+            "set": MapSet(),
+            "has": MapHas(),
+            "delete": MapDelete(),
+            "keys": MapKeys(),
+            "values": MapValues(),
+            "next": Next(),
+            "done": Done(),
+            "memoize": Memoize(),
+            "memoStats": MemoStats(),
+        }
+        for name, arity in STDLIB.items():
+            natives[name] = StdlibNative(name, arity)
+
+        NATIVES = MappingProxyType(natives)
+
+    return NATIVES
+
+
 def set_natives(env: Environment):
-    env.put("clock", Clock())
+    env.env.update(native_table())
 
 
-__all__ = ["set_natives"]
+__all__ = ["native_table", "set_natives"]
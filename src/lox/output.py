@@ -0,0 +1,115 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import io
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class Output(ABC):
+    """
+    Buffered sink for values printed by the interpreter. Lines are collected
+    until buffer_size characters are pending, then emitted in one write.
+    Line buffered outputs emit every line as soon as it is printed.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        line_buffered: bool = False,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.line_buffered = line_buffered
+        self.pending: list[str] = []
+        self.pending_size = 0
+
+    def write_line(self, text: str):
+        self.pending.append(text)
+        self.pending.append("\n")
+        self.pending_size += len(text) + 1
+
+        if self.line_buffered or self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        data = "".join(self.pending)
+        self.pending = []
+        self.pending_size = 0
+        self.emit(data)
+
+    @abstractmethod
+    def emit(self, data: str):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class StreamOutput(Output):
+    def __init__(self, stream: Any, **options) -> None:
+        super().__init__(**options)
+        self.stream = stream
+
+    def emit(self, data: str):
+        self.stream.write(data)
+        self.stream.flush()
+
+
+class StdoutOutput(Output):
+    """
+    Writes to whatever sys.stdout is at flush time, so redirections made
+    after creation are respected.
+    """
+
+    def emit(self, data: str):
+        sys.stdout.write(data)
+        sys.stdout.flush()
+
+
+class FileOutput(StreamOutput):
+    def __init__(self, path: str, **options) -> None:
+        super().__init__(open(path, "w", encoding="utf-8"), **options)
+
+    def close(self):
+        super().close()
+        self.stream.close()
+
+
+class MemoryOutput(Output):
+    def __init__(self, **options) -> None:
+        super().__init__(**options)
+        self.buffer = io.StringIO()
+
+    def emit(self, data: str):
+        self.buffer.write(data)
+
+    def getvalue(self) -> str:
+        self.flush()
+        return self.buffer.getvalue()
+
+
+class CallbackOutput(Output):
+    def __init__(self, callback: Callable[[str], Any], **options) -> None:
+        super().__init__(**options)
+        self.callback = callback
+
+    def emit(self, data: str):
+        self.callback(data)
+
+
+__all__ = [
+    "Output",
+    "StreamOutput",
+    "StdoutOutput",
+    "FileOutput",
+    "MemoryOutput",
+    "CallbackOutput",
+]
@@ -1,11 +1,18 @@
+from __future__ import annotations
+import sys
+from itertools import islice
+
 from src.lox.ast_printer import AstPrinter
 from src.lox.expr import (
     AnonymousFnExpr,
+    ArrayExpr,
     Assignment,
     Call,
     Expr,
     GetExpr,
     Grouping,
+    IndexExpr,
+    IndexSetExpr,
     Logical,
     SetExpr,
     ThisExpr,
@@ -16,39 +23,93 @@ from src.lox.stmt import (
     BlockStmt,
     BreakStmt,
     ClassDeclStmt,
+    CountedLoop,
     ExprStmt,
+    ForInStmt,
     FunDeclStmt,
     IfStmt,
+    ImportStmt,
     PrintStmt,
     ReturnStmt,
     Stmt,
     VarDeclStmt,
     WhileStmt,
+    YieldStmt,
 )
 from src.lox.token import Token, TokenType
 
+DECLARATIONS = (VarDeclStmt, FunDeclStmt, ClassDeclStmt, ImportStmt)
+COMPARISONS = (
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator
+
 
 class SyntaxError(Exception):
     def __init__(self, token: Token, msg: str, *args):
         self.token = token
+        self.msg = msg
         super().__init__(f"at line {token.line}, {msg}", *args)
 
 
+# tokens pulled from a token stream at a time
+WINDOW_SIZE = 4096
+
+
 class Parser:
-    def __init__(self, tokens: list[Token]):
+    def __init__(self, tokens: list[Token] | Iterator[Token]):
         self.current = 0
-        self.tokens = tokens
+        if type(tokens) is list:
+            self.tokens = tokens
+            self.stream = None
+            self.limit = sys.maxsize
+        else:
+            # only a window of a token stream is held, consumed tokens are
+            # dropped as the window moves
+            self.tokens = []
+            self.stream = tokens
+            self.refill()
         self.errors = []
         self.loop_depth = 0
         self.arguments_limit = 10
+        # whether each function being parsed has yielded so far
+        self.yields: list[bool] = []
+        # names assigned in each for loop body being parsed
+        self.assigned: list[set[str]] = []
 
     ## parsing infrastructure
 
     def advance(self):
         if not self.is_at_end():
             self.current += 1
+            if self.current >= self.limit:
+                self.refill()
         return self.previous()
 
+    def refill(self):
+        """
+        Move the window of a token stream, keeping the previous token and at
+        least two tokens of lookahead.
+        """
+        if self.current > 1:
+            del self.tokens[: self.current - 1]
+            self.current = 1
+
+        chunk = list(islice(self.stream, WINDOW_SIZE))
+        self.tokens.extend(chunk)
+
+        if len(chunk) < WINDOW_SIZE:
+            # stream ended, the EOF token is in the window
+            self.limit = sys.maxsize
+        else:
+            self.limit = len(self.tokens) - 2
+
     def previous(self):
         return self.tokens[self.current - 1]
 
@@ -56,10 +117,11 @@ class Parser:
         return self.tokens[self.current]
 
     def is_at_end(self):
-        return self.tokens[self.current].type == TokenType.EOF
+        return self.tokens[self.current].type is TokenType.EOF
 
     def check(self, token_type: TokenType) -> bool:
-        return False if self.is_at_end() else self.peek().type == token_type
+        # never called with EOF, so the EOF token can't match
+        return self.tokens[self.current].type is token_type
 
     def check_next(self, token_type: TokenType) -> bool:
         return (
@@ -69,10 +131,11 @@ class Parser:
         )
 
     def match_any(self, *tokens_type: TokenType) -> bool:
-        for token_type in tokens_type:
-            if self.check(token_type):
-                self.advance()
-                return True
+        if self.tokens[self.current].type in tokens_type:
+            self.current += 1
+            if self.current >= self.limit:
+                self.refill()
+            return True
         return False
 
     ## end of parsing infrastructure
@@ -83,6 +146,7 @@ class Parser:
         declaration -> varDecl
                        | funDecl
                        | classDecl
+                       | importStmt
                        | statement
         """
         try:
@@ -98,7 +162,13 @@ class Parser:
             if self.match_any(TokenType.VAR):
                 return self.var_declaration()
 
+            if self.match_any(TokenType.IMPORT):
+                return self.import_stmt()
+
             return self.statement()
+        except RecursionError:
+            # too deeply nested to parse here, not a syntax error
+            raise
         except Exception as exp:
             self.synchronize()
 
@@ -119,6 +189,18 @@ class Parser:
 
         return VarDeclStmt(identifier, initializer)
 
+    def import_stmt(self) -> Stmt:
+        """
+        Rule implementation.
+        importStmt -> "import" STRING ";"
+        """
+        token = self.previous()
+        path = self.consume(TokenType.STRING, "Expected module path.")
+
+        self.consume(TokenType.SEMICOLON, "Expected ';' after import.")
+
+        return ImportStmt(token, path.literal)
+
     def class_decl(self):
         """
         Rule implementation.
@@ -165,9 +247,13 @@ class Parser:
         self.consume(
             TokenType.LEFT_BRACE, "Expecetd '{' " + f"before {kind} body."
         )
-        body = self.block()
+        self.yields.append(False)
+        try:
+            body = self.block()
+        finally:
+            is_generator = self.yields.pop()
 
-        return AnonymousFnExpr(params, body)
+        return AnonymousFnExpr(params, body, is_generator)
 
     def parameters(self) -> list[Token]:
         """
@@ -207,12 +293,13 @@ class Parser:
                      | forStmt
                      | breakStmt
                      | returnStmt
+                     | yieldStmt
         """
         if self.match_any(TokenType.PRINT):
             return self.print_stmt()
 
         if self.match_any(TokenType.LEFT_BRACE):
-            return BlockStmt(self.block())
+            return self.block_stmt(self.block())
 
         if self.match_any(TokenType.IF):
             return self.if_stmt()
@@ -229,6 +316,9 @@ class Parser:
         if self.match_any(TokenType.RETURN):
             return self.return_stmt()
 
+        if self.match_any(TokenType.YIELD):
+            return self.yield_stmt()
+
         return self.expr_stmt()
 
     def print_stmt(self) -> Stmt:
@@ -266,23 +356,40 @@ class Parser:
 
         return statements
 
+    @staticmethod
+    def block_stmt(statements: list[Stmt]) -> BlockStmt:
+        # blocks declaring nothing need no scope of their own
+        scoped = any(type(stmt) in DECLARATIONS for stmt in statements)
+        return BlockStmt(statements, scoped)
+
     def if_stmt(self) -> Stmt:
         """
         Rule implementation.
         ifStmt -> "if" "(" expression ")" statement
                   ("else" statement)?
         """
-        self.consume(TokenType.LEFT_PAREN, "Expected '( after if.")
-        condition = self.expression()
-        self.consume(TokenType.RIGHT_PAREN, "Expected ') after if condition.")
-
-        then_branch = self.statement()
+        # else if chains are read in a loop, however long they are
+        branches = []
         else_branch = None
 
-        if self.match_any(TokenType.ELSE):
-            else_branch = self.statement()
+        while True:
+            self.consume(TokenType.LEFT_PAREN, "Expected '( after if.")
+            condition = self.expression()
+            self.consume(
+                TokenType.RIGHT_PAREN, "Expected ') after if condition."
+            )
+            branches.append((condition, self.statement()))
+
+            if not self.match_any(TokenType.ELSE):
+                break
+            if not self.match_any(TokenType.IF):
+                else_branch = self.statement()
+                break
+
+        for condition, then_branch in reversed(branches):
+            else_branch = IfStmt(condition, then_branch, else_branch)
 
-        return IfStmt(condition, then_branch, else_branch)
+        return else_branch
 
     def while_stmt(self) -> Stmt:
         """
@@ -290,6 +397,7 @@ class Parser:
         whileStmt -> "while" "(" expression ")" statement
         """
 
+        token = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expected '( after while.")
         condition = self.expression()
         self.consume(
@@ -300,7 +408,7 @@ class Parser:
             self.loop_depth += 1
             body = self.statement()
 
-            return WhileStmt(condition, body)
+            return WhileStmt(condition, body, token)
         finally:
             self.loop_depth -= 1
 
@@ -311,8 +419,12 @@ class Parser:
                     expression? ";"
                     expression? ")" statement
         """
+        token = self.previous()
         self.consume(TokenType.LEFT_PAREN, "Expected '( after for.")
 
+        if self.check_for_in():
+            return self.for_in_stmt(token)
+
         initializer = None
         if not self.match_any(TokenType.SEMICOLON):
             if self.match_any(TokenType.VAR):
@@ -334,21 +446,118 @@ class Parser:
 
         self.consume(TokenType.RIGHT_PAREN, "Expected ') after for clause.")
 
+        self.assigned.append(set())
         try:
             self.loop_depth += 1
             body = self.statement()
+        finally:
+            self.loop_depth -= 1
+            assigned = self.assigned.pop()
+            if self.assigned:
+                self.assigned[-1].update(assigned)
 
-            if increment is not None:
-                body = BlockStmt([body, ExprStmt(increment)])
+        counted = self.counted_loop(
+            initializer, condition, increment, body, assigned
+        )
 
-            body = WhileStmt(
-                condition if condition is not None else Literal(True), body
-            )
+        if increment is not None:
+            body = self.block_stmt([body, ExprStmt(increment)])
 
-            if initializer is not None:
-                body = BlockStmt([initializer, body])
+        body = WhileStmt(
+            condition if condition is not None else Literal(True),
+            body,
+            token,
+            counted,
+        )
 
-            return body
+        if initializer is not None:
+            body = self.block_stmt([initializer, body])
+
+        return body
+
+    @staticmethod
+    def counted_loop(
+        initializer: Stmt | None,
+        condition: Expr | None,
+        increment: Expr | None,
+        body: Stmt,
+        assigned: set[str],
+    ) -> CountedLoop | None:
+        """
+        Counted form of for (var i = start; i < bound; i = i + step), None
+        when the loop has another shape or its body assigns i or bound.
+        """
+        if type(initializer) is not VarDeclStmt or initializer.expr is None:
+            return None
+        name = initializer.identifier.lexeme
+        if name in assigned:
+            return None
+
+        if (
+            type(condition) is not Binary
+            or condition.operator.type not in COMPARISONS
+            or type(condition.left) is not Variable
+            or condition.left.name.lexeme != name
+        ):
+            return None
+        bound = condition.right
+        if type(bound) is Literal:
+            if type(bound.value) is not float:
+                return None
+        elif type(bound) is not Variable or bound.name.lexeme in assigned:
+            return None
+        elif bound.name.lexeme == name:
+            return None
+
+        if type(increment) is not Assignment or increment.name.lexeme != name:
+            return None
+        step = increment.value
+        if (
+            type(step) is not Binary
+            or step.operator.type not in (TokenType.PLUS, TokenType.MINUS)
+            or type(step.left) is not Variable
+            or step.left.name.lexeme != name
+            or type(step.right) is not Literal
+            or type(step.right.value) is not float
+        ):
+            return None
+
+        amount = step.right.value
+        if step.operator.type == TokenType.MINUS:
+            amount = -amount
+
+        return CountedLoop(
+            initializer.identifier, condition.operator.type, bound, amount, body
+        )
+
+
+    def check_for_in(self) -> bool:
+        # 'in' is only a keyword here, so it stays usable as a name
+        if not self.check(TokenType.VAR):
+            return False
+        if not self.check_next(TokenType.IDENTIFIER):
+            return False
+
+        token = self.tokens[self.current + 2]
+        return token.type == TokenType.IDENTIFIER and token.lexeme == "in"
+
+    def for_in_stmt(self, token: Token) -> Stmt:
+        """
+        Rule implementation.
+        forInStmt -> "for" "(" "var" IDENTIFIER "in" expression ")" statement
+        """
+        self.consume(TokenType.VAR, "")
+        name = self.consume(TokenType.IDENTIFIER, "Expect a variable name.")
+        self.advance()
+
+        iterable = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expected ') after for clause.")
+
+        try:
+            self.loop_depth += 1
+            body = self.statement()
+
+            return ForInStmt(token, name, iterable, body)
         finally:
             self.loop_depth -= 1
 
@@ -375,6 +584,24 @@ class Parser:
 
         return ReturnStmt(token, value)
 
+    def yield_stmt(self) -> Stmt:
+        """
+        Rule implementation.
+        yieldStmt -> "yield" expression? ";"
+        """
+        token = self.previous()
+        if not self.yields:
+            raise self.new_error(token, "Can't yield outside of a function.")
+        self.yields[-1] = True
+
+        value = None
+        if not self.check(TokenType.SEMICOLON):
+            value = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expected ';' after expression.")
+
+        return YieldStmt(token, value)
+
     def expression(self) -> Expr:
         """
         Rule implementation.
@@ -385,7 +612,8 @@ class Parser:
     def assignment(self) -> Expr:
         """
         Rule implementation.
-        assignment -> IDENTIFIER "=" assignment
+        assignment -> (call ".")? IDENTIFIER "=" assignment
+                      | call "[" expression "]" "=" assignment
                       | logical_or
         """
         expr = self.logical_or()
@@ -394,9 +622,13 @@ class Parser:
             token = self.previous()
             value = self.assignment()
             if type(expr) is Variable:
+                if self.assigned:
+                    self.assigned[-1].add(expr.name.lexeme)
                 return Assignment(expr.name, value)
             if type(expr) is GetExpr:
                 return SetExpr(expr.object, expr.property_name, value)
+            if type(expr) is IndexExpr:
+                return IndexSetExpr(expr.object, expr.index, value, expr.token)
             self.errors.append(
                 SyntaxError(
                     token, "Invalid assignment. Did you mean to use '=='?"
@@ -511,7 +743,8 @@ class Parser:
     def call(self) -> Expr:
         """
         Rule implementation.
-        call -> primary ("(" arguments? ")" | "." IDENTIFIER)*
+        call -> primary ("(" arguments? ")" | "." IDENTIFIER
+                         | "[" expression "]")*
         """
         expr = self.primary()
 
@@ -523,6 +756,12 @@ class Parser:
                     TokenType.IDENTIFIER, "Expected property name after '.'."
                 )
                 expr = GetExpr(expr, property_name)
+            elif self.match_any(TokenType.LEFT_BRACKET):
+                index = self.expression()
+                token = self.consume(
+                    TokenType.RIGHT_BRACKET, "Expected ']' after index."
+                )
+                expr = IndexExpr(expr, index, token)
             else:
                 break
 
@@ -566,6 +805,7 @@ class Parser:
                    | IDENTIFIER
                    | anonymous_fn
                    | this
+                   | "[" (expression ("," expression)*)? "]"
         """
 
         if self.match_any(TokenType.TRUE):
@@ -591,10 +831,26 @@ class Parser:
         if self.match_any(TokenType.FUN):
             return self.anonymous_fn("function")
 
+        if self.match_any(TokenType.LEFT_BRACKET):
+            return self.array()
+
         error = self.new_error(self.peek(), "Expected expression.")
 
         raise error
 
+    def array(self) -> Expr:
+        elements = []
+
+        if not self.check(TokenType.RIGHT_BRACKET):
+            elements.append(self.expression())
+
+            while self.match_any(TokenType.COMMA):
+                elements.append(self.expression())
+
+        self.consume(TokenType.RIGHT_BRACKET, "Expected closing ']'.")
+
+        return ArrayExpr(elements)
+
     def new_error(self, token: Token, msg) -> Exception:
         error = SyntaxError(token, msg)
         self.errors.append(error)
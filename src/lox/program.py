@@ -0,0 +1,195 @@
+from __future__ import annotations
+from types import MappingProxyType
+
+from src.lox.env import Environment
+from src.lox.exceptions import NativeException
+from src.lox.ffi import make_native, to_lox
+from src.lox.inliner import inline_calls
+from src.lox.interpreter import Interpreter
+from src.lox.limits import Limits
+from src.lox.natives import set_natives
+from src.lox.output import MemoryOutput, Output
+from src.lox.parser import Parser
+from src.lox.resolver import Resolver
+from src.lox.scanner import Scanner
+from src.lox.stmt import Stmt
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class CompileError(Exception):
+    """
+    Raised when source has scan, parse or resolve errors.
+    """
+
+    def __init__(self, errors: list[Exception]) -> None:
+        self.errors = errors
+        super().__init__("\n".join(map(str, errors)))
+
+
+class RunResult:
+    def __init__(self, errors: list[Exception], output: Output) -> None:
+        self.errors = errors
+        self.output = output
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+
+class Program:
+    """
+    Scanned, parsed and resolved script. Immutable, so one program can be run
+    any number of times, each run getting its own interpreter and globals.
+    Runs share nothing mutable and may happen concurrently from any number
+    of threads.
+    """
+
+    __slots__ = ("_statements", "_bindings", "_captures", "_cells")
+
+    def __init__(self, statements: list[Stmt], resolver: Resolver) -> None:
+        self._statements = tuple(statements)
+        self._bindings = MappingProxyType(resolver.bindings)
+        self._captures = MappingProxyType(resolver.captures)
+        self._cells = frozenset(resolver.cells)
+
+    @property
+    def statements(self) -> tuple[Stmt, ...]:
+        return self._statements
+
+    def run(
+        self,
+        globals: dict[str, Any] | None = None,
+        output: Output | None = None,
+        base_dir: str | None = None,
+        limits: Limits | None = None,
+    ) -> RunResult:
+        """
+        Execute the program. Python callables in globals are exposed as
+        natives, other values are converted to Lox values. Output defaults
+        to an in-memory buffer. Imports are resolved against base_dir.
+        Limits bound the run's steps, time, call depth and memory.
+        """
+        interpreter = self._prepare(
+            Interpreter(self._globals(globals), output or MemoryOutput()),
+            base_dir,
+            limits,
+        )
+        interpreter.interpret(self._statements)
+
+        return RunResult(interpreter.errors, interpreter.output)
+
+    async def run_async(
+        self,
+        globals: dict[str, Any] | None = None,
+        output: Output | None = None,
+        base_dir: str | None = None,
+        limits: Limits | None = None,
+        yield_every: int | None = None,
+    ) -> RunResult:
+        """
+        Execute the program as a coroutine, yielding to the event loop every
+        yield_every steps. Async callables in globals are awaited.
+        """
+        from src.lox.async_interpreter import AsyncInterpreter, DEFAULT_YIELD_EVERY
+
+        interpreter = self._prepare(
+            AsyncInterpreter(
+                self._globals(globals),
+                output or MemoryOutput(),
+                yield_every or DEFAULT_YIELD_EVERY,
+            ),
+            base_dir,
+            limits,
+        )
+        await interpreter.interpret(self._statements)
+
+        return RunResult(interpreter.errors, interpreter.output)
+
+    @staticmethod
+    def _globals(globals: dict[str, Any] | None) -> Environment:
+        env = Environment()
+        set_natives(env)
+
+        if globals is not None:
+            for name, value in globals.items():
+                if callable(value):
+                    value = make_native(name, value)
+                else:
+                    try:
+                        value = to_lox(value)
+                    except NativeException as exc:
+                        raise TypeError(f"Global '{name}': {exc}") from None
+                env.put(name, value)
+
+        return env
+
+    def _prepare(
+        self,
+        interpreter: Interpreter,
+        base_dir: str | None,
+        limits: Limits | None,
+    ) -> Interpreter:
+        interpreter.base_dir = base_dir
+        interpreter.set_limits(limits)
+        interpreter.set_bindings(self._bindings)
+        interpreter.set_captures(self._captures, self._cells)
+        return interpreter
+
+
+def front_end(code: str) -> tuple[list[Stmt], Resolver]:
+    """
+    Scan, parse and resolve code without running it. Code nested too deep
+    for the current stack is compiled again on a deeper one, and is a
+    compile error when too deep for that too.
+    """
+    try:
+        return compile_tree(code)
+    except RecursionError:
+        pass
+
+    from src.lox.stack import run_deep
+
+    try:
+        return run_deep(compile_tree, code)
+    except RecursionError:
+        error = RecursionError("Expression nested too deeply.")
+        raise CompileError([error]) from None
+
+
+def compile_tree(code: str) -> tuple[list[Stmt], Resolver]:
+    # tokens are parsed as they are scanned, scan errors take precedence
+    scanner = Scanner(code)
+    parser = Parser(scanner.iter_tokens())
+    stmts = parser.parse()
+
+    if len(scanner.errors) > 0:
+        raise CompileError(scanner.errors)
+
+    if len(parser.errors) > 0:
+        raise CompileError(parser.errors)
+
+    resolver = Resolver()
+    resolver.resolve_stmts(stmts)
+
+    if len(resolver.errors) > 0:
+        raise CompileError(resolver.errors)
+
+    inline_calls(resolver)
+
+    return stmts, resolver
+
+
+def compile_source(code: str) -> Program:
+    return Program(*front_end(code))
+
+
+__all__ = [
+    "CompileError",
+    "Program",
+    "RunResult",
+    "compile_source",
+    "front_end",
+]
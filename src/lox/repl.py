@@ -0,0 +1,97 @@
+"""
+Interactive session support. Every input is compiled on its own against
+the session's globals, its resolution tables are merged into the
+interpreter's and dropped again once nothing can run its code, so memory
+stays flat however long the session runs.
+"""
+
+from __future__ import annotations
+import weakref
+
+from src.lox.scanner import Scanner
+from src.lox.token import TokenType
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from src.lox.interpreter import Interpreter
+    from src.lox.resolver import Resolver
+
+OPENING = (TokenType.LEFT_PAREN, TokenType.LEFT_BRACE, TokenType.LEFT_BRACKET)
+CLOSING = (TokenType.RIGHT_PAREN, TokenType.RIGHT_BRACE, TokenType.RIGHT_BRACKET)
+
+
+def is_complete(code: str) -> bool:
+    """
+    Whether code can be run, False while a bracket or comment is still open
+    and more lines should be read.
+    """
+    scanner = Scanner(code)
+    tokens = scanner.scan_tokens()
+
+    for error in scanner.errors:
+        if error.msg == "Unterminated comment":
+            return False
+
+    depth = 0
+    for token in tokens:
+        if token.type in OPENING:
+            depth += 1
+        elif token.type in CLOSING:
+            depth -= 1
+
+    return depth <= 0
+
+
+class Unit:
+    """
+    Resolution data of one input, released when the input has run and
+    every function it declared has been collected.
+    """
+
+    __slots__ = ("session", "bindings", "cells", "pending")
+
+    def __init__(self, session: Session, resolver: Resolver) -> None:
+        self.session = session
+        self.bindings = list(resolver.bindings)
+        self.cells = resolver.cells
+        # functions still alive plus the input's own run
+        self.pending = len(resolver.resolved_functions) + 1
+
+        for function in resolver.resolved_functions:
+            weakref.finalize(function, self.release)
+
+    def release(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.session.drop(self)
+
+
+class Session:
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        interpreter.set_bindings({})
+        # weak keys, so captures don't keep function nodes alive
+        interpreter.set_captures(weakref.WeakKeyDictionary(), set())
+
+    def add(self, resolver: Resolver) -> Unit:
+        """
+        Merge the tables of a resolved input, release the returned unit once
+        the input has run.
+        """
+        interpreter = self.interpreter
+        interpreter.bindings.update(resolver.bindings)
+        interpreter.captures.update(resolver.captures)
+        interpreter.cells.update(resolver.cells)
+        # sites of dropped inputs would stay cached otherwise
+        interpreter.global_slots.clear()
+
+        return Unit(self, resolver)
+
+    def drop(self, unit: Unit):
+        interpreter = self.interpreter
+        for node in unit.bindings:
+            interpreter.bindings.pop(node, None)
+        interpreter.cells.difference_update(unit.cells)
+
+
+__all__ = ["Session", "is_complete"]
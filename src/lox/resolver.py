@@ -1,6 +1,7 @@
 from src.lox.exceptions import ReferenceException
 from src.lox.expr import (
     AnonymousFnExpr,
+    ArrayExpr,
     Assignment,
     Binary,
     Call,
@@ -8,6 +9,8 @@ from src.lox.expr import (
     ExprVisitor,
     GetExpr,
     Grouping,
+    IndexExpr,
+    IndexSetExpr,
     Literal,
     Logical,
     SetExpr,
@@ -20,14 +23,17 @@ from src.lox.stmt import (
     BreakStmt,
     ClassDeclStmt,
     ExprStmt,
+    ForInStmt,
     FunDeclStmt,
     IfStmt,
+    ImportStmt,
     PrintStmt,
     ReturnStmt,
     Stmt,
     StmtVisitor,
     VarDeclStmt,
     WhileStmt,
+    YieldStmt,
 )
 from src.lox.token import Token, TokenType
 
@@ -35,8 +41,23 @@ from src.lox.token import Token, TokenType
 class Resolver(StmtVisitor, ExprVisitor):
     def __init__(self) -> None:
         self.scopes: list[dict] = []
+        self.declarations: list[dict[str, Token]] = []
         self.errors = []
         self.bindings = {}
+
+        # function being resolved along with index of its first scope
+        self.functions: list[tuple[AnonymousFnExpr | None, int]] = [(None, 0)]
+        # variables each function captures, with distance from its definition
+        self.captures: dict[AnonymousFnExpr, dict[str, int]] = {}
+        # declarations captured by some closure, these are stored in cells
+        self.cells: set[Token] = set()
+        # every function expression resolved
+        self.resolved_functions: list[AnonymousFnExpr] = []
+        # top level declarations by name, names declared again or assigned
+        # as globals, and calls of globals, for the inliner
+        self.top_level: dict[str, Stmt] = {}
+        self.rebound: set[str] = set()
+        self.global_calls: list[Call] = []
         self.resolving_fun = False
         self.resolving_class = False
 
@@ -47,9 +68,11 @@ class Resolver(StmtVisitor, ExprVisitor):
 
     def begin_scope(self):
         self.scopes.append({})
+        self.declarations.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.declarations.pop()
 
     def declare(self, variable: Token):
         if len(self.scopes) == 0:
@@ -61,6 +84,12 @@ class Resolver(StmtVisitor, ExprVisitor):
                 f"A variable named '{variable.lexeme}' already present.",
             )
         self.scopes[-1][variable.lexeme] = False
+        self.declarations[-1][variable.lexeme] = variable
+
+    def declare_top_level(self, name: Token, stmt: Stmt):
+        if name.lexeme in self.top_level:
+            self.rebound.add(name.lexeme)
+        self.top_level[name.lexeme] = stmt
 
     def define(self, variable: Token):
         if len(self.scopes) == 0:
@@ -79,15 +108,48 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.resolve_stmt(stmt)
 
     def resolve_local_var(self, expr: Expr, var: Token):
-        scopes = list(enumerate(self.scopes))
-        scopes.reverse()
-        rel = len(self.scopes) - 1
-        for i, scope in scopes:
-            if scope.get(var.lexeme):
-                self.bindings[expr] = rel - i
+        for i in range(len(self.scopes) - 1, -1, -1):
+            if self.scopes[i].get(var.lexeme):
+                self.bindings[expr] = self.capture(var.lexeme, i)
                 return
 
+    def capture(self, name: str, index: int) -> int:
+        """
+        Distance of variable declared in scope at index from the current
+        scope. Variables outside the current function are captured by every
+        function in between and are reached through the closure environment,
+        which sits right above the function's first scope.
+        """
+        depth = len(self.scopes) - 1
+        _, start = self.functions[-1]
+
+        if index >= start:
+            return depth - index
+
+        declaration = self.declarations[index][name]
+        if declaration.type != TokenType.THIS:
+            self.cells.add(declaration)
+
+        for level in range(len(self.functions) - 1, 0, -1):
+            fun, fun_start = self.functions[level]
+            if fun_start <= index:
+                break
+
+            _, outer_start = self.functions[level - 1]
+            if index >= outer_start:
+                distance = fun_start - 1 - index
+            else:
+                distance = fun_start - outer_start
+
+            self.captures.setdefault(fun, {})[name] = distance
+
+        return depth - start + 1
+
     def visit_block_stmt(self, stmt: BlockStmt):
+        if not stmt.scoped:
+            self.resolve_stmts(stmt.statements)
+            return
+
         self.begin_scope()
 
         self.resolve_stmts(stmt.statements)
@@ -95,6 +157,8 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.end_scope()
 
     def visit_var_decl_stmt(self, stmt: VarDeclStmt):
+        if not self.scopes:
+            self.declare_top_level(stmt.identifier, stmt)
         self.declare(stmt.identifier)
 
         if stmt.expr is not None:
@@ -114,16 +178,25 @@ class Resolver(StmtVisitor, ExprVisitor):
     def visit_assignment(self, expr: Assignment):
         self.resolve_expr(expr.value)
         self.resolve_local_var(expr, expr.name)
+        if expr not in self.bindings:
+            self.rebound.add(expr.name.lexeme)
 
     def visit_fun_decl(self, stmt: FunDeclStmt):
+        if not self.scopes:
+            self.declare_top_level(stmt.name, stmt)
         self.declare(stmt.name)
         self.define(stmt.name)
 
         self.resolve_expr(stmt.declaration)
 
     def visit_anonymous_fn(self, expr: AnonymousFnExpr):
+        self.resolve_function(expr, len(self.scopes))
+
+    def resolve_function(self, expr: AnonymousFnExpr, start: int):
         prev_fn_status = self.resolving_fun
         self.resolving_fun = True
+        self.functions.append((expr, start))
+        self.resolved_functions.append(expr)
         self.begin_scope()
 
         for param in expr.params:
@@ -133,9 +206,12 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.resolve_stmts(expr.body)
 
         self.end_scope()
+        self.functions.pop()
         self.resolving_fun = prev_fn_status
 
     def visit_class_decl(self, stmt: ClassDeclStmt):
+        if not self.scopes:
+            self.declare_top_level(stmt.name, stmt)
         self.declare(stmt.name)
         self.define(stmt.name)
 
@@ -149,10 +225,13 @@ class Resolver(StmtVisitor, ExprVisitor):
         old_class_resolve_state = self.resolving_class
         self.resolving_class = True
         self.begin_scope()
-        self.define(Token(TokenType.THIS, 0, None, "this"))
+        this = Token(TokenType.THIS, 0, None, "this")
+        self.declare(this)
+        self.define(this)
 
+        # methods start at the scope holding 'this', bound per instance
         for method in stmt.methods:
-            self.resolve_expr(method.declaration)
+            self.resolve_function(method.declaration, len(self.scopes) - 1)
 
         self.end_scope()
         self.resolving_class = old_class_resolve_state
@@ -166,8 +245,15 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.resolve_expr(stmt.expr)
 
     def visit_if_stmt(self, stmt: IfStmt):
-        self.resolve_expr(stmt.condition)
-        self.resolve_stmt(stmt.then_branch)
+        while True:
+            self.resolve_expr(stmt.condition)
+            self.resolve_stmt(stmt.then_branch)
+
+            # follow else if chains in a loop
+            if type(stmt.else_branch) is not IfStmt:
+                break
+            stmt = stmt.else_branch
+
         if stmt.else_branch is not None:
             self.resolve_stmt(stmt.else_branch)
 
@@ -175,6 +261,20 @@ class Resolver(StmtVisitor, ExprVisitor):
         self.resolve_expr(stmt.condition)
         self.resolve_stmt(stmt.body)
 
+    def visit_for_in_stmt(self, stmt: ForInStmt):
+        self.resolve_expr(stmt.iterable)
+
+        # the loop variable gets a fresh scope every iteration
+        self.begin_scope()
+        self.declare(stmt.name)
+        self.define(stmt.name)
+        self.resolve_stmt(stmt.body)
+        self.end_scope()
+
+    def visit_import_stmt(self, stmt: ImportStmt):
+        if len(self.scopes) > 0:
+            self.new_error(stmt.token, "Can't import outside of top-level code.")
+
     def visit_print_stmt(self, stmt: PrintStmt):
         self.resolve_expr(stmt.expr)
 
@@ -182,6 +282,15 @@ class Resolver(StmtVisitor, ExprVisitor):
         if self.resolving_fun is False:
             self.new_error(stmt.token, "Can't return from top-level code.")
 
+        if stmt.value is not None:
+            fun, _ = self.functions[-1]
+            if fun is not None and fun.is_generator:
+                self.new_error(
+                    stmt.token, "Can't return a value from a generator."
+                )
+            self.resolve_expr(stmt.value)
+
+    def visit_yield_stmt(self, stmt: YieldStmt):
         if stmt.value is not None:
             self.resolve_expr(stmt.value)
 
@@ -190,13 +299,26 @@ class Resolver(StmtVisitor, ExprVisitor):
 
     def visit_call(self, expr: Call):
         self.resolve_expr(expr.callee)
+        if type(expr.callee) is Variable and expr.callee not in self.bindings:
+            self.global_calls.append(expr)
 
         for arg in expr.arguments:
             self.resolve_expr(arg)
 
     def visit_binary(self, expr: Binary):
-        self.resolve_expr(expr.left)
-        self.resolve_expr(expr.right)
+        self.resolve_operands(expr)
+
+    def resolve_operands(self, expr: Binary | Logical):
+        # operator chains nest to the left as deep as they are long, walk
+        # down the left operands in a loop
+        rights = []
+        while type(expr) is Binary or type(expr) is Logical:
+            rights.append(expr.right)
+            expr = expr.left
+
+        self.resolve_expr(expr)
+        for right in reversed(rights):
+            self.resolve_expr(right)
 
     def visit_grouping(self, expr: Grouping):
         self.resolve_expr(expr.expr)
@@ -205,8 +327,7 @@ class Resolver(StmtVisitor, ExprVisitor):
         pass
 
     def visit_logical(self, expr: Logical):
-        self.resolve_expr(expr.left)
-        self.resolve_expr(expr.right)
+        self.resolve_operands(expr)
 
     def visit_unary(self, expr: Unary):
         self.resolve_expr(expr.right)
@@ -217,3 +338,16 @@ class Resolver(StmtVisitor, ExprVisitor):
     def visit_set_expr(self, expr: SetExpr):
         self.resolve_expr(expr.object)
         self.resolve_expr(expr.value)
+
+    def visit_array_expr(self, expr: ArrayExpr):
+        for element in expr.elements:
+            self.resolve_expr(element)
+
+    def visit_index_expr(self, expr: IndexExpr):
+        self.resolve_expr(expr.object)
+        self.resolve_expr(expr.index)
+
+    def visit_index_set_expr(self, expr: IndexSetExpr):
+        self.resolve_expr(expr.object)
+        self.resolve_expr(expr.index)
+        self.resolve_expr(expr.value)
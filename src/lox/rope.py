@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+
+# concatenations shorter than this are plain python strings
+ROPE_THRESHOLD = 1024
+
+
+class Rope:
+    """
+    Lox string built by concatenation. Pieces are kept in a list shared
+    between ropes derived from one another, so `s = s + piece` appends in
+    amortized O(1). The string is joined only when it is observed.
+    """
+
+    __slots__ = ("parts", "count", "length", "flat")
+
+    def __init__(self, parts: list[str], length: int) -> None:
+        self.parts = parts
+        self.count = len(parts)
+        self.length = length
+        self.flat: str | None = None
+
+    def append(self, piece: str) -> Rope:
+        parts = self.parts
+        # another rope already extended the shared list past this one
+        if len(parts) != self.count:
+            parts = parts[: self.count]
+
+        parts.append(piece)
+        return Rope(parts, self.length + len(piece))
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            parts = self.parts
+            if len(parts) != self.count:
+                parts = parts[: self.count]
+            self.flat = "".join(parts)
+        return self.flat
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __bool__(self) -> bool:
+        return self.length > 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (str, Rope)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+def is_string(value) -> bool:
+    return type(value) is str or type(value) is Rope
+
+
+def concat(left: str | Rope, right: str | Rope) -> str | Rope:
+    right = str(right)
+
+    if type(left) is Rope:
+        return left.append(right)
+
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        return left + right
+
+    return Rope([left, right], len(left) + len(right))
+
+
+__all__ = ["Rope", "concat", "is_string"]
@@ -1,8 +1,11 @@
-from curses.ascii import isalnum, isalpha
-import typing
+from __future__ import annotations
 
 from src.lox.token import KEYWORDS, Token, TokenType
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterator
+
 
 class TokenError(Exception):
     def __init__(self, line: int, char: str, msg=None, *args):
@@ -19,6 +22,32 @@ class UnterminatedStringError(TokenError):
         super().__init__(line, "", self.msg, *args)
 
 
+SINGLE_CHAR_TOKENS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+}
+
+# token types of a character, and of it followed by '='
+COMPARISON_TOKENS = {
+    "=": (TokenType.EQUAL, TokenType.EQUAL_EQUAL),
+    "!": (TokenType.BANG, TokenType.BANG_EQUAL),
+    ">": (TokenType.GREATER, TokenType.GREATER_EQUAL),
+    "<": (TokenType.LESS, TokenType.LESS_EQUAL),
+}
+
+DIGITS = frozenset("0123456789")
+
+
 class Scanner:
     def __init__(self, source_code: str):
         self.source_code: str = source_code
@@ -30,6 +59,8 @@ class Scanner:
         self.line = 1
 
         self.errors: list[Exception] = []
+        # one string per distinct name, instead of one per occurrence
+        self.names: dict[str, str] = {}
 
     def has_more(self) -> bool:
         return self.current < len(self.source_code)
@@ -49,13 +80,13 @@ class Scanner:
 
         return False
 
-    def add_token(self, token_type: TokenType, literal: typing.Any = None):
+    def add_token(self, token_type: TokenType, literal: Any = None):
         lexeme = self.source_code[self.start : self.current]
         self.tokens.append(Token(token_type, self.line, literal, lexeme))
 
     def exhaust_line(self):
-        while self.peek() != "\n" and self.has_more():
-            self.advance()
+        end = self.source_code.find("\n", self.current)
+        self.current = len(self.source_code) if end == -1 else end
 
     def peek(self) -> str:
         if self.has_more():
@@ -68,50 +99,63 @@ class Scanner:
         return "\0"
 
     def scan_string(self):
-        while self.has_more():
-            char = self.peek()
-
-            if char == '"':
-                break
-            if char == "\n":
-                return self.errors.append(UnterminatedStringError(self.line))
+        source = self.source_code
+        end = source.find('"', self.current)
+        newline = source.find("\n", self.current, len(source) if end == -1 else end)
 
-            self.advance()
-        else:
+        if newline != -1:
+            self.current = newline
+            return self.errors.append(UnterminatedStringError(self.line))
+        if end == -1:
+            self.current = len(source)
             return self.errors.append(UnterminatedStringError(self.line))
 
-        value = self.source_code[self.start + 1 : self.current]
+        self.current = end
+        value = source[self.start + 1 : end]
 
         self.advance()
 
         self.add_token(TokenType.STRING, value)
 
     def scan_number(self):
-        while self.peek().isdigit():
-            self.advance()
+        self.skip_digits()
 
-        if self.peek() == "." and self.peek_next().isdigit():
+        if self.peek() == "." and self.peek_next() in DIGITS:
             self.advance()
-
-            while self.peek().isdigit():
-                self.advance()
+            self.skip_digits()
 
         self.add_token(
             TokenType.NUMBER, float(self.source_code[self.start : self.current])
         )
 
+    def skip_digits(self):
+        source = self.source_code
+        current = self.current
+        length = len(source)
+        while current < length and source[current] in DIGITS:
+            current += 1
+        self.current = current
+
     def scan_identifier(self):
-        while self.isalnum(self.peek()):
-            self.advance()
+        source = self.source_code
+        current = self.current
+        length = len(source)
+        while current < length:
+            char = source[current]
+            if not (char.isalnum() or char == "_"):
+                break
+            current += 1
+        self.current = current
 
-        lexeme = self.source_code[self.start : self.current]
+        lexeme = source[self.start : current]
+        lexeme = self.names.setdefault(lexeme, lexeme)
 
         token_type = KEYWORDS.get(lexeme)
 
         if token_type is None:
             token_type = TokenType.IDENTIFIER
 
-        self.add_token(token_type)
+        self.tokens.append(Token(token_type, self.line, None, lexeme))
 
     def ignore_comment_block(self):
         while True:
@@ -136,47 +180,17 @@ class Scanner:
     def scan_token(self):
         char = self.advance()
 
+        token_type = SINGLE_CHAR_TOKENS.get(char)
+        if token_type is not None:
+            self.add_token(token_type)
+            return
+
+        token_types = COMPARISON_TOKENS.get(char)
+        if token_types is not None:
+            self.add_token(token_types[self.match("=")])
+            return
+
         match char:
-            case "(":
-                self.add_token(TokenType.LEFT_PAREN)
-            case ")":
-                self.add_token(TokenType.RIGHT_PAREN)
-            case "{":
-                self.add_token(TokenType.LEFT_BRACE)
-            case "}":
-                self.add_token(TokenType.RIGHT_BRACE)
-            case ",":
-                self.add_token(TokenType.COMMA)
-            case ".":
-                self.add_token(TokenType.DOT)
-            case "-":
-                self.add_token(TokenType.MINUS)
-            case "+":
-                self.add_token(TokenType.PLUS)
-            case ";":
-                self.add_token(TokenType.SEMICOLON)
-            case "*":
-                self.add_token(TokenType.STAR)
-            case "=":
-                self.add_token(
-                    TokenType.EQUAL_EQUAL
-                    if self.match("=")
-                    else TokenType.EQUAL
-                )
-            case "!":
-                self.add_token(
-                    TokenType.BANG_EQUAL if self.match("=") else TokenType.BANG
-                )
-            case ">":
-                self.add_token(
-                    TokenType.GREATER_EQUAL
-                    if self.match("=")
-                    else TokenType.GREATER
-                )
-            case "<":
-                self.add_token(
-                    TokenType.LESS_EQUAL if self.match("=") else TokenType.LESS
-                )
             case "/":
                 if self.match("/"):
                     self.exhaust_line()
@@ -191,7 +205,7 @@ class Scanner:
             case "\n":
                 self.line += 1
             case _:
-                if char.isdigit():
+                if char in DIGITS:
                     self.scan_number()
                 elif self.isalpha(char):
                     self.scan_identifier()
@@ -200,20 +214,32 @@ class Scanner:
                     self.errors.append(error)
 
     def scan_tokens(self) -> list[Token]:
-        while self.has_more():
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """
+        Tokens as they are scanned, none are kept once consumed. Errors are
+        collected along the way, check them after the last token.
+        """
+        source = self.source_code
+        length = len(source)
+        tokens = self.tokens
+        while self.current < length:
+            char = source[self.current]
+            # whitespace is most of a source, skip it without a token scan
+            if char == " " or char == "\t" or char == "\r":
+                self.current += 1
+                continue
             self.start = self.current
             self.scan_token()
+            if tokens:
+                yield from tokens
+                tokens.clear()
 
-        self.tokens.append(Token(TokenType.EOF, self.line, None, ""))
-
-        return self.tokens
+        yield Token(TokenType.EOF, self.line, None, "")
 
     # utils
 
     @staticmethod
     def isalpha(char: str) -> bool:
         return char.isalpha() or char == "_"
-
-    @staticmethod
-    def isalnum(char: str) -> bool:
-        return char.isalnum() or char == "_"
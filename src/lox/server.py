@@ -0,0 +1,223 @@
+"""
+Long running interpreter server, started with `plox --serve`.
+
+The server listens on a unix domain socket and forks worker processes after
+importing and warming up the interpreter, so requests skip python startup.
+Workers keep compiled programs cached by content hash. Every script run is
+bounded by the limits the server was started with.
+
+Requests are one JSON line: {"path": ..., "argv": [...]} or
+{"source": ..., "argv": [...]}. Responses are JSON lines, {"out": text} for
+script output followed by a single {"exit": code}. The script sees its
+arguments as the global array `argv`.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import signal
+import socket
+import sys
+
+from src.lox.ast_printer import format_error
+from src.lox.client import default_socket_path
+from src.lox.limits import Limits
+from src.lox.output import CallbackOutput
+from src.lox.program import CompileError, Program, compile_source
+
+
+class ProgramCache:
+    """
+    Compiled programs, or their compile errors, keyed by source hash.
+    Least recently used entries are evicted past size.
+    """
+
+    def __init__(self, size: int = 256) -> None:
+        self.size = size
+        self.programs: OrderedDict[str, Program | CompileError] = OrderedDict()
+
+    def get(self, source: str) -> Program:
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+        program = self.programs.get(key)
+        if program is None:
+            try:
+                program = compile_source(source)
+            except CompileError as error:
+                program = error
+            self.programs[key] = program
+            if len(self.programs) > self.size:
+                self.programs.popitem(last=False)
+        else:
+            self.programs.move_to_end(key)
+
+        if isinstance(program, CompileError):
+            raise program
+        return program
+
+
+def send(conn: socket.socket, frame: dict):
+    conn.sendall(json.dumps(frame).encode("utf-8") + b"\n")
+
+
+def handle(conn: socket.socket, cache: ProgramCache, limits: Limits):
+    with conn.makefile("r", encoding="utf-8") as reader:
+        request = json.loads(reader.readline())
+
+    output = CallbackOutput(lambda data: send(conn, {"out": data}))
+
+    if (
+        not isinstance(request, dict)
+        or not isinstance(request.get("source", request.get("path")), str)
+        or not isinstance(request.get("argv", []), list)
+    ):
+        output.write_line(
+            'Usage: {"path": string, "argv": [...]} or '
+            '{"source": string, "argv": [...]}'
+        )
+        output.flush()
+        return send(conn, {"exit": 64})
+
+    argv = request.get("argv", [])
+
+    source = request.get("source")
+    if source is None:
+        try:
+            with open(request["path"], "r", encoding="utf-8") as file:
+                source = file.read()
+        except (OSError, UnicodeDecodeError) as error:
+            output.write_line(str(error))
+            output.flush()
+            return send(conn, {"exit": 66})
+
+    try:
+        program = cache.get(source)
+    except CompileError as error:
+        for err in error.errors:
+            output.write_line(format_error(err))
+        output.flush()
+        return send(conn, {"exit": 65})
+
+    base_dir = None
+    if "path" in request:
+        base_dir = os.path.dirname(request["path"])
+
+    try:
+        result = program.run(
+            globals={"argv": argv},
+            output=output,
+            base_dir=base_dir,
+            limits=limits,
+        )
+        errors = result.errors
+    except Exception as error:
+        # a failing script must not take the worker and its cache with it
+        errors = [error]
+    for err in errors:
+        output.write_line(format_error(err))
+    output.flush()
+
+    send(conn, {"exit": 70 if errors else 0})
+
+
+def worker(server: socket.socket, limits: Limits):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    cache = ProgramCache()
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            try:
+                handle(conn, cache, limits)
+            except (OSError, ValueError):
+                # client hung up or sent a malformed request
+                pass
+            except Exception as error:
+                try:
+                    send(conn, {"out": format_error(error) + "\n"})
+                    send(conn, {"exit": 70})
+                except OSError:
+                    pass
+
+
+def spawn(server: socket.socket, limits: Limits) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            worker(server, limits)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def warm_up():
+    """
+    Exercise the front end and interpreter once so forked workers inherit
+    imported modules and initialized caches.
+    """
+    compile_source("fun f(a) { return a + 1; } print f(1);").run()
+
+
+def serve(socket_path: str, workers: int, limits: Limits):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(128)
+
+    warm_up()
+
+    children = {spawn(server, limits) for _ in range(workers)}
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        while True:
+            pid, _ = os.wait()
+            # replace workers that died
+            if pid in children:
+                children.remove(pid)
+                children.add(spawn(server, limits))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        server.close()
+        os.unlink(socket_path)
+
+
+def main(args: list[str]):
+    socket_path = default_socket_path()
+    workers = os.cpu_count() or 1
+    limits = Limits()
+
+    args = iter(args)
+    for arg in args:
+        if arg == "--socket":
+            socket_path = next(args, socket_path)
+        elif arg == "--workers":
+            workers = int(next(args, workers))
+        elif arg == "--timeout":
+            limits.timeout = float(next(args, 0)) or None
+        elif arg == "--max-steps":
+            limits.max_steps = int(next(args, 0)) or None
+        elif arg == "--max-depth":
+            limits.max_depth = int(next(args, 0)) or None
+        else:
+            print(
+                "Usage: plox --serve [--socket path] [--workers n] "
+                "[--timeout seconds] [--max-steps n] [--max-depth n]"
+            )
+            sys.exit(64)
+
+    serve(socket_path, workers, limits)
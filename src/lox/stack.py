@@ -0,0 +1,87 @@
+"""
+Running recursive code, like the parser and resolver, on input nested
+deeper than the default recursion limit allows.
+"""
+
+import sys
+import threading
+
+# stack of the thread deep calls run on, and the recursion limit it allows
+STACK_SIZE = 512 * 1024 * 1024
+RECURSION_LIMIT = 200_000
+
+
+# held while the process wide recursion limit or thread stack size change
+lock = threading.Lock()
+# raises in effect, and the limit to restore when the last of them ends
+raises = 0
+restore_limit = 0
+
+
+def raise_recursion_limit(limit: int):
+    """
+    Raise the process wide recursion limit to at least limit, at most
+    RECURSION_LIMIT, until the matching restore_recursion_limit.
+
+    Raises overlapping on other threads keep the highest limit until the
+    last one ends, lowering the limit while a thread runs deeper than it
+    would fail fatally.
+    """
+    global raises, restore_limit
+
+    with lock:
+        current = sys.getrecursionlimit()
+        if raises == 0:
+            restore_limit = current
+        raises += 1
+        if current < limit:
+            sys.setrecursionlimit(min(limit, RECURSION_LIMIT))
+
+
+def restore_recursion_limit():
+    """
+    End a raise_recursion_limit, restoring the limit it replaced when no
+    other raise is in effect.
+    """
+    global raises
+
+    with lock:
+        raises -= 1
+        if raises == 0:
+            sys.setrecursionlimit(restore_limit)
+
+
+def run_deep(function, *args):
+    """
+    Call function on a thread with a large stack and recursion limit,
+    returning its result or raising its exception. The recursion limit is
+    raised only while function runs.
+    """
+    outcome = []
+
+    def target():
+        raise_recursion_limit(RECURSION_LIMIT)
+        try:
+            outcome.append((True, function(*args)))
+        except BaseException as exc:
+            outcome.append((False, exc))
+        finally:
+            restore_recursion_limit()
+
+    with lock:
+        previous_size = threading.stack_size(STACK_SIZE)
+        try:
+            thread = threading.Thread(target=target)
+            thread.start()
+        finally:
+            threading.stack_size(previous_size)
+
+    thread.join()
+
+    ok, value = outcome[0]
+    if not ok:
+        raise value
+    return value
+
+
+__all__ = ["raise_recursion_limit", "restore_recursion_limit", "run_deep"]
@@ -0,0 +1,170 @@
+"""
+Standard library natives implemented in python. Loaded on the first call of
+any of them, see natives.STDLIB for names and arities.
+"""
+
+import math
+import re
+
+from src.lox.ast_printer import stringify
+from src.lox.exceptions import NativeException
+from src.lox.rope import Rope
+
+
+def expect_number(value) -> float:
+    if type(value) is not float:
+        raise NativeException("Expected a number.")
+    return value
+
+
+def expect_string(value) -> str:
+    if type(value) is Rope:
+        return str(value)
+    if type(value) is not str:
+        raise NativeException("Expected a string.")
+    return value
+
+
+def expect_integer(value) -> int:
+    if type(value) is not float or not value.is_integer():
+        raise NativeException("Expected an integer.")
+    return int(value)
+
+
+## ----------- math ----------------
+
+
+def sqrt(x):
+    return math.sqrt(expect_number(x))
+
+
+def floor(x):
+    return float(math.floor(expect_number(x)))
+
+
+def ceil(x):
+    return float(math.ceil(expect_number(x)))
+
+
+def abs_(x):
+    return abs(expect_number(x))
+
+
+def round_(x):
+    # halves round up, like most scripting languages. Adding 0.5 before
+    # flooring rounds up values just below a half, like 0.49999999999999994
+    x = expect_number(x)
+    whole = math.floor(x)
+    return float(whole + (x - whole >= 0.5))
+
+
+def pow_(x, y):
+    return math.pow(expect_number(x), expect_number(y))
+
+
+def min_(x, y):
+    return min(expect_number(x), expect_number(y))
+
+
+def max_(x, y):
+    return max(expect_number(x), expect_number(y))
+
+
+def sin(x):
+    return math.sin(expect_number(x))
+
+
+def cos(x):
+    return math.cos(expect_number(x))
+
+
+def exp(x):
+    return math.exp(expect_number(x))
+
+
+def log(x):
+    return math.log(expect_number(x))
+
+
+## ----------- strings ----------------
+
+
+def substring(s, start, end):
+    start = expect_integer(start)
+    end = expect_integer(end)
+    if start < 0 or end < 0:
+        raise NativeException("Substring indices can't be negative.")
+    return expect_string(s)[start:end]
+
+
+def char_at(s, i):
+    s = expect_string(s)
+    i = expect_integer(i)
+    if i < 0 or i >= len(s):
+        raise NativeException("String index out of range.")
+    return s[i]
+
+
+def char_code(s, i):
+    return float(ord(char_at(s, i)))
+
+
+def from_char_code(code):
+    return chr(expect_integer(code))
+
+
+def index_of(s, sub):
+    return float(expect_string(s).find(expect_string(sub)))
+
+
+def upper(s):
+    return expect_string(s).upper()
+
+
+def lower(s):
+    return expect_string(s).lower()
+
+
+# number literals as the scanner reads them, with an optional sign
+NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?")
+
+
+def to_number(s):
+    s = expect_string(s).strip()
+    if NUMBER.fullmatch(s) is None:
+        return None
+    return float(s)
+
+
+def to_string(value):
+    return stringify(value)
+
+
+def to_fixed(x, digits):
+    return f"{expect_number(x):.{expect_integer(digits)}f}"
+
+
+FUNCTIONS = {
+    "sqrt": sqrt,
+    "floor": floor,
+    "ceil": ceil,
+    "abs": abs_,
+    "round": round_,
+    "pow": pow_,
+    "min": min_,
+    "max": max_,
+    "sin": sin,
+    "cos": cos,
+    "exp": exp,
+    "log": log,
+    "substring": substring,
+    "charAt": char_at,
+    "charCode": char_code,
+    "fromCharCode": from_char_code,
+    "indexOf": index_of,
+    "upper": upper,
+    "lower": lower,
+    "toNumber": to_number,
+    "toString": to_string,
+    "toFixed": to_fixed,
+}
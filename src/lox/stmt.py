@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
 
-from src.lox.token import Token
+from src.lox.token import Token, TokenType
 
+TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from src.lox.expr import AnonymousFnExpr, Expr, Variable
+    from src.lox.expr import AnonymousFnExpr, Expr, Literal, Variable
 
 
 class StmtVisitor(ABC):
@@ -50,47 +50,73 @@ class StmtVisitor(ABC):
     def visit_class_decl(self, stmt: ClassDeclStmt):
         pass
 
+    @abstractmethod
+    def visit_import_stmt(self, stmt: ImportStmt):
+        pass
+
+    @abstractmethod
+    def visit_yield_stmt(self, stmt: YieldStmt):
+        pass
+
+    @abstractmethod
+    def visit_for_in_stmt(self, stmt: ForInStmt):
+        pass
+
 
 class Stmt(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor):
         pass
 
 
 class ExprStmt(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
     def accept(self, visitor):
-        visitor.visit_expr_stmt(self)
+        return visitor.visit_expr_stmt(self)
 
 
 class PrintStmt(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr):
         self.expr = expr
 
     def accept(self, visitor):
-        visitor.visit_print_stmt(self)
+        return visitor.visit_print_stmt(self)
 
 
 class VarDeclStmt(Stmt):
+    __slots__ = ("identifier", "expr")
+
     def __init__(self, identifier: Token, expr: Expr | None):
         self.identifier = identifier
         self.expr = expr
 
     def accept(self, visitor):
-        visitor.visit_var_decl_stmt(self)
+        return visitor.visit_var_decl_stmt(self)
 
 
 class BlockStmt(Stmt):
-    def __init__(self, statements: list[Stmt]) -> None:
+    __slots__ = ("statements", "scoped")
+
+    def __init__(self, statements: list[Stmt], scoped: bool = True) -> None:
         self.statements = statements
+        # False when the block declares nothing and runs in the enclosing scope
+        self.scoped = scoped
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_block_stmt(self)
+        return visitor.visit_block_stmt(self)
 
 
 class IfStmt(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(
         self,
         condition: Expr,
@@ -102,27 +128,66 @@ class IfStmt(Stmt):
         self.else_branch = else_branch
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_if_stmt(self)
+        return visitor.visit_if_stmt(self)
+
+
+class CountedLoop:
+    """
+    For loop stepping a variable by a constant towards a bound, which the
+    loop body never assigns. Runs without evaluating condition and
+    increment through the visitor when the values allow.
+    """
+
+    __slots__ = ("name", "operator", "bound", "step", "body")
+
+    def __init__(
+        self,
+        name: Token,
+        operator: TokenType,
+        bound: Literal | Variable,
+        step: float,
+        body: Stmt,
+    ) -> None:
+        self.name = name
+        self.operator = operator
+        self.bound = bound
+        self.step = step
+        # the loop body without the increment
+        self.body = body
 
 
 class WhileStmt(Stmt):
-    def __init__(self, condition: Expr, body: Stmt) -> None:
+    __slots__ = ("condition", "body", "token", "counted")
+
+    def __init__(
+        self,
+        condition: Expr,
+        body: Stmt,
+        token: Token | None = None,
+        counted: CountedLoop | None = None,
+    ) -> None:
         self.condition = condition
         self.body = body
+        self.token = token
+        self.counted = counted
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_while_stmt(self)
+        return visitor.visit_while_stmt(self)
 
 
 class BreakStmt(Stmt):
+    __slots__ = ()
+
     def __init__(self) -> None:
         pass
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_break_stmt(self)
+        return visitor.visit_break_stmt(self)
 
 
 class FunDeclStmt(Stmt):
+    __slots__ = ("name", "declaration")
+
     def __init__(self, name: Token, declaration: Expr) -> None:
         self.name = name
         self.declaration = declaration
@@ -132,15 +197,19 @@ class FunDeclStmt(Stmt):
 
 
 class ReturnStmt(Stmt):
+    __slots__ = ("token", "value")
+
     def __init__(self, token, value: Expr | None) -> None:
         self.token = token
         self.value = value
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_return_stmt(self)
+        return visitor.visit_return_stmt(self)
 
 
 class ClassDeclStmt(Stmt):
+    __slots__ = ("name", "superclass", "methods")
+
     def __init__(
         self,
         name: Token,
@@ -152,4 +221,41 @@ class ClassDeclStmt(Stmt):
         self.methods = methods
 
     def accept(self, visitor: StmtVisitor):
-        visitor.visit_class_decl(self)
+        return visitor.visit_class_decl(self)
+
+
+class ImportStmt(Stmt):
+    __slots__ = ("token", "path")
+
+    def __init__(self, token: Token, path: str) -> None:
+        self.token = token
+        self.path = path
+
+    def accept(self, visitor: StmtVisitor):
+        return visitor.visit_import_stmt(self)
+
+
+class YieldStmt(Stmt):
+    __slots__ = ("token", "value")
+
+    def __init__(self, token: Token, value: Expr | None) -> None:
+        self.token = token
+        self.value = value
+
+    def accept(self, visitor: StmtVisitor):
+        return visitor.visit_yield_stmt(self)
+
+
+class ForInStmt(Stmt):
+    __slots__ = ("token", "name", "iterable", "body")
+
+    def __init__(
+        self, token: Token, name: Token, iterable: Expr, body: Stmt
+    ) -> None:
+        self.token = token
+        self.name = name
+        self.iterable = iterable
+        self.body = body
+
+    def accept(self, visitor: StmtVisitor):
+        return visitor.visit_for_in_stmt(self)
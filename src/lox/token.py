@@ -1,5 +1,9 @@
+from __future__ import annotations
 from enum import Enum, auto
-import typing
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
 
 
 class TokenType(Enum):
@@ -8,6 +12,8 @@ class TokenType(Enum):
     RIGHT_PAREN = auto()
     LEFT_BRACE = auto()
     RIGHT_BRACE = auto()
+    LEFT_BRACKET = auto()
+    RIGHT_BRACKET = auto()
     COMMA = auto()
     DOT = auto()
     MINUS = auto()
@@ -49,12 +55,16 @@ class TokenType(Enum):
     VAR = auto()
     WHILE = auto()
     BREAK = auto()
+    IMPORT = auto()
+    YIELD = auto()
     EOF = auto()
 
 
 class Token:
+    __slots__ = ("type", "line", "literal", "lexeme")
+
     def __init__(
-        self, type: TokenType, line: int, literal: typing.Any, lexeme: str
+        self, type: TokenType, line: int, literal: Any, lexeme: str
     ):
         self.type = type
         self.line = line
@@ -83,4 +93,6 @@ KEYWORDS = {
     "var": TokenType.VAR,
     "while": TokenType.WHILE,
     "break": TokenType.BREAK,
+    "import": TokenType.IMPORT,
+    "yield": TokenType.YIELD,
 }